@@ -0,0 +1,358 @@
+"""Reads every configured meter port and logs it, in one process.
+
+Each port in acquisition.json gets its own power log directory, real-time
+snapshot files, shared-memory ring for the relay and a stats file. Ports are
+read concurrently from one asyncio event loop; a port that is missing or
+unplugged is retried every reconnect_delay seconds without affecting the
+others. A port's "protocol" is "ascii" (comma-separated lines, the default)
+or "binary" (CRC-checked float32 frames, see frame_protocol.py).
+
+    python3 acquisition_daemon.py [config.json] [--device NAME=PATH ...]
+
+--device overrides a port's device, e.g. to read a pseudo-terminal instead
+of a meter while testing:
+
+    python3 acquisition_daemon.py --device Input=/dev/pts/5
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import serial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Shared modules at the project root
+from sample_ring import SampleRing
+from sample_schema import HEADERS, parse_values
+from line_reader import SerialLineReader
+from frame_protocol import BinaryFrameReader
+from log_writer import PowerLogWriter
+from segment_compressor import SegmentCompressor
+from sample_clock import ComputerTS, PortClock, SampleClock
+from columnar_log import ColumnarLogWriter
+from port_health import PortHealth
+from snapshot import publish_snapshot, serialize_snapshot
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "acquisition.json")
+
+DEFAULT_OPTIONS = {
+    "base_dir": "/home/rahul/Desktop/Project",
+    "write_realtime_csv": True,
+    "log_flush_rows": 50,
+    "log_flush_interval": 1.0,
+    "log_fsync_interval": 10.0,
+    "log_rotate_bytes": 16 * 1024 * 1024,
+    "log_rotate_interval": 86400,  # New segment at local midnight
+    "log_compression": "gzip",
+    "columnar_log": False,  # Also write float32 column chunks, see columnar_log.py
+    "columnar_chunk_rows": 4096,
+    "columnar_flush_interval": 1.0,  # Seconds a sample may wait in memory before its chunk is rewritten
+    "stats_interval": 5.0,
+    "stall_after": 5.0,  # Seconds without a sample before a port is reported stalled
+    "reconnect_delay": 2.0,
+}
+
+PortConfig = namedtuple("PortConfig", "name device baud_rate protocol log_dir realtime_dir ring")
+
+MAX_REPORTED_ERRORS = 5  # Decode errors printed per stats interval
+PID_FILE_NAME = "acquisition_daemon.pid"  # In base_dir, so the relay can signal a flush on a trip
+
+ASCII = "ascii"    # Comma-separated text lines of 22 values
+BINARY = "binary"  # frame_protocol frames of 22 float32 values
+
+def load_config(path, devices=None):
+    """Returns (options, [PortConfig, ...]) from the JSON config, with device overrides applied."""
+    with open(path) as f:
+        config = json.load(f)
+    options = {**DEFAULT_OPTIONS, **{k: v for k, v in config.items() if k != "ports"}}
+    devices = devices or {}
+    ports = []
+    for entry in config["ports"]:
+        name = entry["name"]
+        ports.append(PortConfig(
+            name=name,
+            device=devices.get(name, entry["device"]),
+            baud_rate=entry.get("baud_rate", 115200),
+            protocol=entry.get("protocol", ASCII),
+            log_dir=os.path.join(options["base_dir"], entry.get("log_dir", f"{name} Data Log")),
+            realtime_dir=os.path.join(options["base_dir"], entry.get("realtime_dir", f"{name} Real Time Data")),
+            ring=entry.get("ring"),
+        ))
+    for port in ports:
+        if port.protocol not in (ASCII, BINARY):
+            raise ValueError(f"Port {port.name}: unknown protocol {port.protocol!r}")
+    unknown = set(devices) - {port.name for port in ports}
+    if unknown:
+        raise ValueError(f"No port named {', '.join(sorted(unknown))} in {path}")
+    return options, ports
+
+class PortLogger:
+    """Acquisition for one meter port: serial reads, parsing and all of its outputs."""
+
+    def __init__(self, port, options, clock):
+        self.port = port
+        self.options = options
+        self.clock = PortClock(clock)  # Shared offset, per-port ordering
+        self.realtime_files = [
+            os.path.join(port.realtime_dir, "Real-time data for GUI.csv"),
+            os.path.join(port.realtime_dir, "Real-time data for relay.csv"),
+        ]
+        self.stats_path = os.path.join(port.realtime_dir, "acquisition_stats.json")
+        self.ser = None
+        self.reader = None
+        self.ring = None
+        self.log_writer = None
+        self.log_path = None  # CSV segment the columnar chunks were last flushed against
+        self.columnar = None
+        self.disconnected = None
+        # Stats
+        self.health = PortHealth(options["stall_after"])
+        self.started = datetime.now()
+        self.connects = 0
+        self.last_timestamp = None
+        self.last_error = None
+        self.reported_errors = 0  # Decode errors printed this stats interval
+
+    def open_outputs(self, compressor):
+        os.makedirs(self.port.log_dir, exist_ok=True)
+        os.makedirs(self.port.realtime_dir, exist_ok=True)
+        self.log_writer = PowerLogWriter(self.port.log_dir, HEADERS, self.options["log_flush_rows"],
+                                         self.options["log_flush_interval"], self.options["log_fsync_interval"],
+                                         self.options["log_rotate_bytes"], self.options["log_rotate_interval"],
+                                         compressor)
+        # Segments a previous run left uncompressed
+        compressor.recover(self.port.log_dir, exclude=(self.log_writer.path,))
+        print(f"[{self.port.name}] Main log file: {self.log_writer.path}")
+        self.log_path = self.log_writer.path
+        if self.options["columnar_log"]:
+            self.columnar = ColumnarLogWriter(self.port.log_dir, self.options["columnar_chunk_rows"],
+                                              self.options["columnar_flush_interval"])
+            print(f"[{self.port.name}] Columnar log: {self.columnar.path}")
+        if self.port.ring:
+            self.ring = SampleRing.create(self.port.ring)
+            print(f"[{self.port.name}] Publishing samples to {self.port.ring}")
+
+    def close(self):
+        self._disconnect()
+        if self.ring is not None:
+            self.ring.close()
+        if self.log_writer is not None:
+            self.log_writer.close()
+        if self.columnar is not None:
+            self.columnar.close()
+
+    def flush_logs(self):
+        """Gets every sample logged so far to disk without waiting for the flush intervals."""
+        self.log_writer.request_flush()
+        if self.columnar is not None:
+            self.columnar.flush()
+
+    async def run(self):
+        """Keeps the port connected and read until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self.ser = serial.Serial(self.port.device, self.port.baud_rate, timeout=0)
+            except (serial.SerialException, OSError) as e:
+                self.health.serial_errors += 1
+                self.last_error = str(e)
+                print(f"[{self.port.name}] Serial error: {e}")
+                await asyncio.sleep(self.options["reconnect_delay"])
+                continue
+
+            self.connects += 1
+            self.last_error = None
+            print(f"[{self.port.name}] Connected to {self.port.device} at {self.port.baud_rate} baud")
+            if self.reader is None:
+                self.reader = BinaryFrameReader(self.ser) if self.port.protocol == BINARY else SerialLineReader(self.ser)
+            self.disconnected = loop.create_future()
+            loop.add_reader(self.ser.fileno(), self._readable)
+            try:
+                await self.disconnected
+            finally:
+                self._disconnect()
+            await asyncio.sleep(self.options["reconnect_delay"])
+
+    def _disconnect(self):
+        if self.ser is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self.ser.fileno())
+            except (RuntimeError, ValueError, OSError):
+                pass
+            self.ser.close()
+            self.ser = None
+
+    def _readable(self):
+        # Event-loop callback: the port has data, take everything that is buffered
+        try:
+            chunk = os.read(self.ser.fileno(), 65536)
+            backlog = self.ser.in_waiting
+        except OSError as e:
+            self.health.serial_errors += 1
+            chunk, self.last_error = b"", str(e)
+        if not chunk:
+            print(f"[{self.port.name}] Port closed: {self.last_error or 'end of file'}")
+            if not self.disconnected.done():
+                self.disconnected.set_result(None)
+            return
+        lines = self.reader.feed(chunk, time.monotonic_ns(), backlog)
+        health = self.health
+        health.bytes += len(chunk)
+        health.lines += len(lines)
+        if backlog > health.max_backlog_bytes:
+            health.max_backlog_bytes = backlog
+        handle = self.handle_frame if self.port.protocol == BINARY else self.handle_line
+        for acquired, item in lines:
+            handle(acquired, item)
+
+    def handle_line(self, acquired, line):
+        """Parses one ASCII meter line and publishes it."""
+        data = line.split(',')
+        values = parse_values(data)  # None unless all 22 fields are numbers
+        if values is None:
+            self.health.decode_errors += 1
+            if self.reported_errors < MAX_REPORTED_ERRORS:  # The rest only show up in the stats
+                self.reported_errors += 1
+                print(f"[{self.port.name}] Ignored partial data: {line}")
+            return
+        self.publish(acquired, time.monotonic_ns(), values, data)
+
+    def handle_frame(self, acquired, values):
+        """Publishes one binary frame, already unpacked and CRC-checked by the reader."""
+        parsed = time.monotonic_ns()
+        self.publish(acquired, parsed, values, [f"{v:.7g}" for v in values])  # float32 carries ~7 digits
+
+    def publish(self, acquired, parsed, values, data):
+        """Sends one sample to the ring, the log and the real-time files."""
+        # Computer_TS is the arrival time, not when the backlog was drained;
+        # it is only formatted as text when a CSV row is written
+        timestamp = ComputerTS(self.clock.wall_ns(acquired))
+        full_data = [timestamp] + data
+
+        # Publish to the relay first, it is the latency-critical reader
+        if self.ring is not None:
+            self.ring.publish((timestamp.timestamp(),) + values, acquired, parsed)
+
+        self.log_writer.write_row(full_data)
+        if self.columnar is not None:
+            self.columnar.append(timestamp.ns, values)
+            if self.log_writer.path != self.log_path:
+                self.columnar.flush()  # The CSV segment rotated, keep the columnar copy level with it
+        self.log_path = self.log_writer.path
+
+        if self.options["write_realtime_csv"]:
+            publish_snapshot(self.realtime_files, serialize_snapshot(HEADERS, full_data))
+
+        written = time.monotonic_ns()
+        self.health.record_write(written - parsed)
+        self.health.samples += 1
+        self.health.last_sample = written
+        self.last_timestamp = timestamp  # Formatted only when the periodic status line prints it
+
+    def stats(self):
+        """Health snapshot for the stats files. Rates cover the time since the previous call."""
+        reader = self.reader
+        self.reported_errors = 0
+        return {
+            "port": self.port.name,
+            "device": self.port.device,
+            "protocol": self.port.protocol,
+            "connected": self.ser is not None,
+            "connects": self.connects,
+            "started": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+            "last_sample": self.last_timestamp and str(self.last_timestamp),
+            **self.health.snapshot(reader.backlog_bytes if reader else 0, getattr(reader, "crc_errors", 0)),
+            "skipped_bytes": getattr(reader, "skipped_bytes", 0),
+            "reads": reader.reads if reader else 0,
+            "largest_batch": reader.largest_batch if reader else 0,
+            "last_error": self.last_error,
+        }
+
+    def write_stats(self, stats=None):
+        try:
+            publish_snapshot([self.stats_path], json.dumps(stats or self.stats(), indent=2).encode())
+        except OSError as e:
+            print(f"[{self.port.name}] Stats write error: {e}")
+
+def write_status(loggers, status_path):
+    """Rewrites every port's stats file and the combined status file for supervision."""
+    ports = []
+    for port_logger in loggers:
+        if port_logger.columnar is not None:
+            port_logger.columnar.flush_if_due()  # A port that went quiet still gets its last rows written
+        stats = port_logger.stats()
+        port_logger.write_stats(stats)
+        ports.append(stats)
+        print(f"[{stats['port']}] {stats['samples_per_s']} samples/s, last updated @ {stats['last_sample']}")
+    status = {
+        "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "healthy": all(p["connected"] and not p["stalled"] for p in ports),
+        "ports": ports,
+    }
+    try:
+        publish_snapshot([status_path], json.dumps(status, indent=2).encode())
+    except OSError as e:
+        print(f"Status write error: {e}")
+
+async def write_stats_periodically(loggers, status_path, interval):
+    while True:
+        await asyncio.sleep(interval)
+        write_status(loggers, status_path)
+
+async def run(options, ports):
+    # One background thread compresses closed log segments for every port
+    compressor = SegmentCompressor(options["log_compression"]).start()
+    clock = SampleClock()  # Shared, so every port's timestamps are comparable
+    loggers = [PortLogger(port, options, clock) for port in ports]
+    for port_logger in loggers:
+        port_logger.open_outputs(compressor)
+
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+    # SIGUSR1 flushes every power log immediately. The relay sends it when it trips,
+    # finding this process through the pid file, so the samples before a fault are on disk.
+    loop.add_signal_handler(signal.SIGUSR1, lambda: [pl.flush_logs() for pl in loggers])
+    pid_path = os.path.join(options["base_dir"], PID_FILE_NAME)
+    with open(pid_path, 'w') as f:
+        f.write(f"{os.getpid()}\n")
+
+    tasks = [asyncio.create_task(port_logger.run()) for port_logger in loggers]
+    status_path = os.path.join(options["base_dir"], "acquisition_status.json")
+    tasks.append(asyncio.create_task(write_stats_periodically(loggers, status_path, options["stats_interval"])))
+    print("Logging started. Press CTRL+C to stop.")
+    try:
+        await stop
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for port_logger in loggers:
+            port_logger.close()
+        write_status(loggers, status_path)
+        compressor.stop()
+        try:
+            os.remove(pid_path)
+        except OSError:
+            pass
+        print("\nLogging stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description="Meter acquisition for every configured serial port")
+    parser.add_argument("config", nargs="?", default=DEFAULT_CONFIG)
+    parser.add_argument("--device", action="append", default=[], metavar="NAME=PATH",
+                        help="read port NAME from PATH instead of its configured device")
+    args = parser.parse_args()
+
+    devices = dict(item.split("=", 1) for item in args.device)
+    options, ports = load_config(args.config, devices)
+    asyncio.run(run(options, ports))
+
+if __name__ == "__main__":
+    main()
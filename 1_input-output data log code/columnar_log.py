@@ -0,0 +1,150 @@
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from sample_schema import VALUE_NAMES, VALUE_COUNT
+
+SCHEMA_NAME = "schema.json"
+SCHEMA_VERSION = 1
+
+class ColumnarLogWriter:
+    """Writes a port's samples as chunked column files next to the CSV log.
+
+    Each session is a columnar_<timestamp> directory holding schema.json and,
+    for every chunk_rows samples, chunk_NNNNNN_ts.npy (int64 wall-clock ns)
+    and chunk_NNNNNN.npy (float32, one row per meter column, so every column
+    is contiguous). Chunk files are replaced whole through a temp file, so a
+    reader never sees a torn one; load_session() maps them without parsing.
+
+    The chunk being filled is written out once its oldest unwritten row is
+    flush_interval seconds old (and on flush(), e.g. when the CSV log
+    rotates), then rewritten under the same name as it grows, so at most
+    flush_interval seconds of samples are only in memory.
+    """
+
+    def __init__(self, log_dir, chunk_rows=4096, flush_interval=1.0):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        self.path = os.path.join(log_dir, f"columnar_{timestamp}")
+        os.makedirs(self.path)
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.timestamps = np.empty(chunk_rows, dtype=np.int64)
+        self.values = np.empty((VALUE_COUNT, chunk_rows), dtype=np.float32)
+        self.rows = 0
+        self.saved_rows = 0  # Rows of the current chunk already on disk
+        self.pending_since = None  # time.monotonic() of the oldest row not on disk
+        self.chunks = 0
+        schema = {
+            "version": SCHEMA_VERSION,
+            "timestamp": {"name": "Computer_TS", "dtype": "int64", "unit": "ns since epoch"},
+            "columns": VALUE_NAMES,
+            "dtype": "float32",
+            "layout": "columns x rows",
+            "chunk_rows": chunk_rows,
+        }
+        with open(os.path.join(self.path, SCHEMA_NAME), 'w') as f:
+            json.dump(schema, f, indent=2)
+
+    def append(self, timestamp_ns, values):
+        self.timestamps[self.rows] = timestamp_ns
+        self.values[:, self.rows] = values
+        self.rows += 1
+        if self.pending_since is None:
+            self.pending_since = time.monotonic()
+        if self.rows == self.chunk_rows:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        """Flushes if the oldest row not on disk is flush_interval seconds old."""
+        if self.pending_since is not None and time.monotonic() - self.pending_since >= self.flush_interval:
+            self.flush()
+
+    def _save(self, name, array):
+        final_path = os.path.join(self.path, name)
+        temp_path = f"{final_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(temp_path, final_path)
+
+    def flush(self):
+        """Writes the current chunk as it stands; a full one is closed and the next one started."""
+        if self.rows == self.saved_rows:
+            return
+        prefix = f"chunk_{self.chunks:06d}"
+        # Values first: a chunk counts as present once its _ts file exists,
+        # and readers use only as many values as there are timestamps
+        self._save(f"{prefix}.npy", np.ascontiguousarray(self.values[:, :self.rows]))
+        self._save(f"{prefix}_ts.npy", self.timestamps[:self.rows])
+        self.pending_since = None
+        if self.rows == self.chunk_rows:
+            self.chunks += 1
+            self.rows = 0
+        self.saved_rows = self.rows
+
+    def close(self):
+        self.flush()
+
+def _check_schema(session_dir):
+    with open(os.path.join(session_dir, SCHEMA_NAME)) as f:
+        schema = json.load(f)
+    if schema["version"] != SCHEMA_VERSION or schema["columns"] != VALUE_NAMES:
+        raise ValueError(f"{session_dir} was written with a different column schema")
+
+def iter_chunks(session_dir):
+    """Yields (timestamps, values) memory maps for each chunk of a session, in order."""
+    _check_schema(session_dir)
+    for ts_path in sorted(glob.glob(os.path.join(session_dir, "chunk_*_ts.npy"))):
+        timestamps = np.load(ts_path, mmap_mode='r')
+        values = np.load(ts_path[:-len("_ts.npy")] + ".npy", mmap_mode='r')
+        yield timestamps, values[:, :len(timestamps)]  # A growing chunk may have its values rewritten first
+
+def _empty():
+    return np.empty(0, dtype=np.int64), np.empty((VALUE_COUNT, 0), dtype=np.float32)
+
+def load_session(session_dir):
+    """Returns (timestamps, values) for one columnar session.
+
+    timestamps is int64 ns since the epoch, values is float32 with one row per
+    meter column (values[VALUE_NAMES.index("Frequency")] is the frequency
+    series). A single-chunk session is returned as memory maps; longer ones
+    are concatenated into memory, so use iter_chunks() or load_range() to
+    work through a long session piece by piece.
+    """
+    chunks = list(iter_chunks(session_dir))
+    if not chunks:
+        return _empty()
+    if len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate([ts for ts, _ in chunks]), np.concatenate([values for _, values in chunks], axis=1)
+
+def load_range(log_dir, start_ns, end_ns):
+    """Samples in [start_ns, end_ns) from every columnar session in log_dir, in time order.
+
+    Only the timestamp files are scanned; a chunk's values are read only for
+    the samples in the range, and chunks without any are skipped.
+    """
+    timestamps, values = [], []
+    for session_dir in sorted(glob.glob(os.path.join(log_dir, "columnar_*"))):
+        for ts, vals in iter_chunks(session_dir):
+            if not len(ts) or ts.max() < start_ns or ts.min() >= end_ns:
+                continue
+            keep = np.flatnonzero((ts >= start_ns) & (ts < end_ns))
+            if not len(keep):
+                continue
+            if keep[-1] - keep[0] + 1 == len(keep):  # Contiguous, as it is unless the clock stepped back
+                timestamps.append(ts[keep[0]:keep[-1] + 1])
+                values.append(vals[:, keep[0]:keep[-1] + 1])
+            else:
+                timestamps.append(ts[keep])
+                values.append(vals[:, keep])
+    if not timestamps:
+        return _empty()
+    if len(timestamps) == 1:
+        return timestamps[0], values[0]  # Memory-mapped slice of a single chunk
+    return np.concatenate(timestamps), np.concatenate(values, axis=1)
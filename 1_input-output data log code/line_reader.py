@@ -0,0 +1,49 @@
+class SerialLineReader:
+    """Reads every complete line waiting on a serial port, with arrival times.
+
+    The caller reads everything the OS has buffered whenever the port is
+    readable and hands the bytes to feed(), so a meter sending faster than
+    one line per wakeup never builds up a backlog.
+
+    Each line gets a time.monotonic_ns() arrival stamp. Lines that came in one
+    read share the read time, so the stamp is moved back by the transmission
+    time of the bytes that followed the line at the port's baud rate: the line
+    had fully arrived no later than that.
+    """
+
+    def __init__(self, ser, max_line=4096):
+        self.ser = ser
+        self.max_line = max_line
+        self.byte_ns = 10 * 1_000_000_000 // ser.baudrate  # Start + 8 data + stop bits
+        self.partial = b""
+        # Backlog and throughput counters
+        self.lines_read = 0
+        self.reads = 0
+        self.largest_batch = 0
+        self.backlog_bytes = 0   # Bytes still in the OS buffer after the last read
+        self.backlog_lines = 0   # Complete lines returned by the last read beyond the first
+
+    def feed(self, chunk, read_ns, backlog_bytes=0):
+        """Splits bytes read at read_ns into stamped lines: [(arrival_ns, line), ...], oldest first."""
+        self.reads += 1
+        self.backlog_bytes = backlog_bytes
+
+        data = self.partial + chunk
+        parts = data.split(b"\n")
+        self.partial = parts.pop()
+        if len(self.partial) > self.max_line:
+            self.partial = b""  # No line ending from the meter, drop the garbage
+
+        lines = []
+        remaining = len(data) - sum(len(part) + 1 for part in parts)  # Bytes after the current line
+        for part in reversed(parts):
+            line = part.decode(errors='ignore').strip()
+            if line:
+                lines.append((read_ns - remaining * self.byte_ns, line))
+            remaining += len(part) + 1
+        lines.reverse()
+
+        self.lines_read += len(lines)
+        self.largest_batch = max(self.largest_batch, len(lines))
+        self.backlog_lines = max(0, len(lines) - 1)
+        return lines
@@ -0,0 +1,153 @@
+import csv
+import os
+import threading
+import time
+from datetime import datetime
+
+from segment_compressor import Segment
+
+def new_segment_path(log_dir):
+    """power_log_<timestamp>.csv in log_dir, named after the time it was started."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    return os.path.join(log_dir, f"power_log_{timestamp}.csv")
+
+def next_boundary(now, interval):
+    """Next multiple of interval seconds in local time (e.g. midnight for 86400)."""
+    offset = time.localtime(now).tm_gmtoff
+    return ((now + offset) // interval + 1) * interval - offset
+
+class PowerLogWriter:
+    """Keeps a power_log CSV open and appends rows through a buffer.
+
+    Rows reach the file when flush_rows rows are pending, when the oldest
+    pending row is flush_interval seconds old, or straight away when written
+    with urgent=True or on request_flush() (the acquisition daemon calls it on
+    SIGUSR1, which the relay sends when it trips). A background thread applies
+    the time limit, handles request_flush() and fsyncs the file every
+    fsync_interval seconds without holding up write_row() while the disk
+    syncs. The file is opened in plain append mode, so other processes can
+    read it while it is written; they see whole flushed rows, possibly
+    followed by one that is still being written.
+
+    The log is split into segments in log_dir: a new power_log_<timestamp>.csv
+    is started once the current one reaches rotate_bytes, or at every
+    rotate_interval boundary of wall-clock time (e.g. 86400 for midnight).
+    Closed segments are handed to the compressor, which runs on its own thread.
+    """
+
+    def __init__(self, log_dir, headers, flush_rows=50, flush_interval=1.0, fsync_interval=10.0,
+                 rotate_bytes=None, rotate_interval=None, compressor=None, buffer_size=64 * 1024):
+        self.log_dir = log_dir
+        self.headers = headers
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval = rotate_interval
+        self.compressor = compressor
+        self.buffer_size = buffer_size
+        self.lock = threading.Lock()
+        self._open_segment()
+        self.pending = 0
+        self.oldest_pending = None
+        self.flush_requested = False
+        self.synced = True
+        self.closed = threading.Event()
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="power-log-writer", daemon=True)
+        self.thread.start()
+
+    def _open_segment(self):
+        self.path = new_segment_path(self.log_dir)
+        self.file = open(self.path, 'a', newline='', buffering=self.buffer_size)
+        self.writer = csv.writer(self.file)
+        self.segment_bytes = self.writer.writerow(self.headers)
+        self.file.flush()
+        self.first = self.last = None
+        self.rows = 0
+        self.rotate_at = next_boundary(time.time(), self.rotate_interval) if self.rotate_interval else None
+
+    def _close_segment(self):
+        self.file.flush()
+        self.file.close()
+        if self.compressor is not None and self.rows:
+            self.compressor.submit(Segment(self.path, str(self.first), str(self.last), self.rows))
+
+    def _rotate(self):
+        self._close_segment()
+        self._open_segment()
+        self.pending = 0
+        self.oldest_pending = None
+        self.synced = True
+
+    def _rotation_due(self):
+        if self.rotate_at is not None and time.time() >= self.rotate_at:
+            if self.rows:
+                return True
+            self.rotate_at = next_boundary(time.time(), self.rotate_interval)  # Nothing logged that period
+        return bool(self.rotate_bytes) and self.segment_bytes >= self.rotate_bytes
+
+    def write_row(self, row, urgent=False):
+        with self.lock:
+            if self._rotation_due():
+                self._rotate()
+            self.segment_bytes += self.writer.writerow(row)  # Characters written, the log is ASCII
+            if self.first is None:
+                self.first = row[0]
+            self.last = row[0]
+            self.rows += 1
+            self.pending += 1
+            if self.oldest_pending is None:
+                self.oldest_pending = time.monotonic()
+            if urgent or self.flush_requested or self.pending >= self.flush_rows:
+                self._flush()
+
+    def request_flush(self):
+        """Has the background thread flush pending rows now."""
+        self.flush_requested = True
+        self.wakeup.set()
+
+    def _flush(self):
+        self.file.flush()
+        self.pending = 0
+        self.oldest_pending = None
+        self.flush_requested = False
+        self.synced = False
+
+    def _run(self):
+        last_sync = time.monotonic()
+        tick = min(self.flush_interval, self.fsync_interval) / 2
+        while True:
+            self.wakeup.wait(tick)
+            self.wakeup.clear()
+            if self.closed.is_set():
+                break
+            now = time.monotonic()
+            sync_fd = None
+            with self.lock:
+                if self._rotation_due():
+                    self._rotate()  # Time boundary passed while no rows arrived
+                    continue
+                if self.pending and (self.flush_requested or now - self.oldest_pending >= self.flush_interval):
+                    self._flush()
+                if not self.synced and now - last_sync >= self.fsync_interval:
+                    sync_fd = os.dup(self.file.fileno())  # Stays valid if the segment is rotated meanwhile
+                    self.synced = True
+                    last_sync = now
+            if sync_fd is not None:
+                # fsync can take long on an SD card; write_row() keeps running meanwhile
+                try:
+                    os.fsync(sync_fd)
+                except OSError as e:
+                    print(f"Log fsync error: {e}")
+                finally:
+                    os.close(sync_fd)
+
+    def close(self):
+        self.closed.set()
+        self.wakeup.set()
+        self.thread.join()
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self._close_segment()
@@ -0,0 +1,60 @@
+import time
+
+class PortHealth:
+    """Health counters for one acquisition port.
+
+    The read path only increments plain attributes. snapshot() turns them
+    into totals, per-second rates and write latency over the interval since
+    the previous snapshot, so a supervisor can tell a stalled, noisy or
+    overloaded meter link from the stats file alone.
+    """
+
+    RATED = ("bytes", "lines", "samples", "decode_errors")
+
+    def __init__(self, stall_after=5.0):
+        self.stall_after = stall_after
+        self.bytes = 0           # Bytes read from the port
+        self.lines = 0           # Complete lines or frames split out of them
+        self.samples = 0         # Samples published
+        self.decode_errors = 0   # ASCII lines that were not 22 numbers
+        self.serial_errors = 0   # Failed opens and reads
+        self.max_backlog_bytes = 0
+        self.last_sample = None  # time.monotonic_ns() of the last published sample
+        # Write latency (parse -> ring, log and snapshot written) over the current interval
+        self.write_count = 0
+        self.write_ns_total = 0
+        self.write_ns_max = 0
+        self.previous = (time.monotonic(), {name: 0 for name in self.RATED})
+
+    def record_write(self, ns):
+        self.write_count += 1
+        self.write_ns_total += ns
+        if ns > self.write_ns_max:
+            self.write_ns_max = ns
+
+    def snapshot(self, backlog_bytes, rejected_frames):
+        now = time.monotonic()
+        then, previous = self.previous
+        elapsed = max(now - then, 1e-9)
+        totals = {name: getattr(self, name) for name in self.RATED}
+        rates = {f"{name}_per_s": round((totals[name] - previous[name]) / elapsed, 2) for name in self.RATED}
+        self.previous = (now, totals)
+
+        sample_age = None if self.last_sample is None else (time.monotonic_ns() - self.last_sample) / 1e9
+        write_latency = {
+            "mean_ms": round(self.write_ns_total / self.write_count / 1e6, 3) if self.write_count else None,
+            "max_ms": round(self.write_ns_max / 1e6, 3) if self.write_count else None,
+        }
+        self.write_count = self.write_ns_total = self.write_ns_max = 0
+
+        return {
+            **totals,
+            **rates,
+            "rejected_frames": rejected_frames,
+            "serial_errors": self.serial_errors,
+            "backlog_bytes": backlog_bytes,
+            "max_backlog_bytes": self.max_backlog_bytes,
+            "write_latency": write_latency,
+            "last_sample_age_s": None if sample_age is None else round(sample_age, 3),
+            "stalled": sample_age is None or sample_age > self.stall_after,
+        }
@@ -0,0 +1,89 @@
+import time
+
+class SampleClock:
+    """Converts time.monotonic_ns() stamps to wall-clock nanoseconds.
+
+    The wall-clock offset is captured once per resync_interval instead of
+    calling time.time() for every sample. Every port shares one clock, so
+    input and output timestamps are directly comparable. A wall clock that
+    moved forward is followed at once. One that moved back by less than
+    step_threshold seconds is slewed in at slew_rate (500 ppm, like ntpd), so
+    converted times keep advancing; a larger backward step is taken at once
+    rather than holding every timestamp until the wall clock catches up.
+    """
+
+    def __init__(self, resync_interval=60.0, slew_rate=0.0005, step_threshold=1.0):
+        self.resync_ns = int(resync_interval * 1e9)
+        self.slew_rate = slew_rate
+        self.step_ns = int(step_threshold * 1e9)
+        self.synced_at = time.monotonic_ns()
+        self.base_offset = self.target_offset = time.time_ns() - self.synced_at
+
+    def _offset(self, monotonic_ns):
+        slewed = self.base_offset - int(max(0, monotonic_ns - self.synced_at) * self.slew_rate)
+        return max(self.target_offset, slewed)
+
+    def _resync(self):
+        mono = time.monotonic_ns()
+        target = time.time_ns() - mono
+        current = self._offset(mono)
+        if current - self.step_ns < target < current:
+            self.base_offset = current  # Slew back towards target
+        else:
+            self.base_offset = target
+        self.target_offset = target
+        self.synced_at = mono
+
+    def wall_ns(self, monotonic_ns):
+        if monotonic_ns - self.synced_at >= self.resync_ns:
+            self._resync()
+        return monotonic_ns + self._offset(monotonic_ns)
+
+class PortClock:
+    """One port's view of a shared SampleClock, with strictly increasing stamps.
+
+    Back-dated arrival stamps can come out equal to or before the previous
+    sample's; such a sample is stamped 1 ns after it instead, so a port's
+    timestamps stay unique and in order without holding back other ports.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.last_wall = 0
+
+    def wall_ns(self, monotonic_ns):
+        wall = self.clock.wall_ns(monotonic_ns)
+        if wall <= self.last_wall:
+            wall = self.last_wall + 1
+        self.last_wall = wall
+        return wall
+
+_second = None
+_second_text = ""
+
+class ComputerTS:
+    """A wall-clock stamp that formats itself as a Computer_TS string on first use.
+
+    csv.writer calls str() on it, so the text is only built when a row is
+    actually written, and only once however many outputs it goes to. The
+    date and time part is reused for every sample within the same second.
+    """
+    __slots__ = ("ns", "_text")
+
+    def __init__(self, ns):
+        self.ns = ns
+        self._text = None
+
+    def __str__(self):
+        global _second, _second_text
+        if self._text is None:
+            second, rest = divmod(self.ns, 1_000_000_000)
+            if second != _second:
+                _second_text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+                _second = second
+            self._text = f"{_second_text}.{rest // 1_000_000:03d}"
+        return self._text
+
+    def timestamp(self):
+        """Seconds since the epoch, as datetime.timestamp() returns."""
+        return self.ns / 1e9
@@ -0,0 +1,115 @@
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+from collections import namedtuple
+
+try:
+    import zstandard
+except ImportError:  # gzip only without the zstandard package
+    zstandard = None
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# A closed power log segment: its path, first/last Computer_TS and data row count
+Segment = namedtuple("Segment", "path first last rows")
+
+_STOP = object()
+
+def read_segment(path):
+    """Builds a Segment for a log file by reading its first and last data rows."""
+    first = last = None
+    rows = 0
+    with open(path, 'r', newline='') as f:
+        next(f, None)  # Header
+        for line in f:
+            if not line.endswith('\n'):
+                break  # Cut off mid-row
+            timestamp = line.split(',', 1)[0]
+            if first is None:
+                first = timestamp
+            last = timestamp
+            rows += 1
+    return Segment(path, first, last, rows)
+
+class SegmentCompressor:
+    """Compresses closed power log segments on a background thread.
+
+    Each segment is written to <name>.gz (or .zst) next to the original, which
+    is removed once the compressed copy is complete. A line describing the
+    segment (file names, Computer_TS range, rows, sizes) is appended to
+    manifest.jsonl in the segment's directory.
+    """
+
+    def __init__(self, method="gzip", level=6):
+        if method == "zstd" and zstandard is None:
+            print("zstandard not installed - compressing log segments with gzip")
+            method = "gzip"
+        self.method = method
+        self.level = level
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="log-compressor", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Finishes every queued segment and stops the thread."""
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def submit(self, segment):
+        self.queue.put(segment)
+
+    def recover(self, log_dir, pattern="power_log_*.csv", exclude=()):
+        """Queues uncompressed segments left behind by an earlier run."""
+        for path in sorted(glob.glob(os.path.join(log_dir, pattern))):
+            if path not in exclude:
+                try:
+                    self.submit(read_segment(path))
+                except OSError as e:
+                    print(f"Log segment read error: {e}")
+
+    def _compress(self, segment):
+        suffix = ".zst" if self.method == "zstd" else ".gz"
+        target = segment.path + suffix
+        temp_path = f"{target}.tmp"
+        with open(segment.path, 'rb') as source, open(temp_path, 'wb') as raw:
+            if self.method == "zstd":
+                with zstandard.ZstdCompressor(level=self.level).stream_writer(raw, closefd=False) as out:
+                    shutil.copyfileobj(source, out)
+            else:
+                with gzip.GzipFile(filename=os.path.basename(segment.path), mode='wb',
+                                   compresslevel=self.level, fileobj=raw) as out:
+                    shutil.copyfileobj(source, out)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(temp_path, target)
+
+        entry = {
+            "segment": os.path.basename(target),
+            "source": os.path.basename(segment.path),
+            "first": segment.first,
+            "last": segment.last,
+            "rows": segment.rows,
+            "bytes": os.path.getsize(segment.path),
+            "compressed_bytes": os.path.getsize(target),
+            "compression": self.method,
+        }
+        with open(os.path.join(os.path.dirname(segment.path), MANIFEST_NAME), 'a') as manifest:
+            manifest.write(json.dumps(entry) + "\n")
+        os.remove(segment.path)
+
+    def _run(self):
+        while True:
+            segment = self.queue.get()
+            if segment is _STOP:
+                break
+            try:
+                self._compress(segment)
+            except Exception as e:
+                print(f"Log compression error for {segment.path}: {e}")
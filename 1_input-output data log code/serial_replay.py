@@ -0,0 +1,205 @@
+"""Plays meter data into a pseudo-terminal, standing in for a physical meter.
+
+The source is either a recorded power log (power_log_*.csv or a compressed
+.csv.gz segment) or a synthetic scenario with an optional fault. Lines are
+paced from their Computer_TS at real time, N times faster, or as fast as the
+reader takes them (--speed 0).
+
+    python3 serial_replay.py "Input Data Log/power_log_20250325_123320_773.csv" --speed 10 --link /tmp/meter_input
+    python3 serial_replay.py --synthetic overcurrent --rate 50 --fault-after 5 --link /tmp/meter_output
+
+Point the acquisition daemon at the printed pty (or the --link path):
+
+    python3 acquisition_daemon.py --device Input=/tmp/meter_input --device Output=/tmp/meter_output
+"""
+import argparse
+import csv
+import gzip
+import itertools
+import os
+import random
+import sys
+import time
+import tty
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Shared modules at the project root
+from sample_schema import (A_PHASE_CURRENT, A_PHASE_VOLTAGE, B_PHASE_CURRENT, B_PHASE_VOLTAGE, C_PHASE_CURRENT,
+                           C_PHASE_VOLTAGE, DC_CURRENT, DC_VOLTAGE, FREQUENCY, PHASE_COLUMNS, PHASE_POWER_COLUMNS,
+                           TEMPERATURE, VALUE_COUNT, VALUE_OFFSET, parse_values)
+from frame_protocol import encode_frame
+
+# Healthy operating point for synthetic data, per sample_schema column
+NOMINAL = {"voltage": 230.0, "current": 10.0, "power_factor": 0.95, "frequency": 50.0,
+           "dc_voltage": 48.0, "dc_current": 5.0, "temperature": 35.0}
+
+# Scenario -> {column: multiplier applied while the fault is active}
+SCENARIOS = {
+    "normal": {},
+    "overcurrent": {A_PHASE_CURRENT: 5.0, B_PHASE_CURRENT: 5.0, C_PHASE_CURRENT: 5.0},
+    "phase_a_overcurrent": {A_PHASE_CURRENT: 5.0},
+    "overvoltage": {A_PHASE_VOLTAGE: 1.2, B_PHASE_VOLTAGE: 1.2, C_PHASE_VOLTAGE: 1.2},
+    "undervoltage": {A_PHASE_VOLTAGE: 0.7, B_PHASE_VOLTAGE: 0.7, C_PHASE_VOLTAGE: 0.7},
+    "underfrequency": {FREQUENCY: 0.95},
+    "overfrequency": {FREQUENCY: 1.05},
+    "dc_overcurrent": {DC_CURRENT: 4.0},
+    "dc_undervoltage": {DC_VOLTAGE: 0.7},
+    "overtemperature": {TEMPERATURE: 2.5},
+}
+
+def _column(column):
+    return column - VALUE_OFFSET
+
+def synthetic_sample(scenario, faulted, noise=0.01):
+    """One set of 22 meter values around NOMINAL, with the scenario's fault applied if faulted."""
+    values = [0.0] * VALUE_COUNT
+    jitter = lambda value: value * (1 + random.uniform(-noise, noise))
+    for phase, (voltage, current) in PHASE_COLUMNS.items():
+        values[_column(voltage)] = jitter(NOMINAL["voltage"])
+        values[_column(current)] = jitter(NOMINAL["current"])
+    values[_column(FREQUENCY)] = NOMINAL["frequency"] * (1 + random.uniform(-noise, noise) / 10)
+    values[_column(DC_VOLTAGE)] = jitter(NOMINAL["dc_voltage"])
+    values[_column(DC_CURRENT)] = jitter(NOMINAL["dc_current"])
+    values[_column(TEMPERATURE)] = jitter(NOMINAL["temperature"])
+    if faulted:
+        for column, factor in SCENARIOS[scenario].items():
+            values[_column(column)] *= factor
+    # Powers follow from the (possibly faulted) voltage and current
+    for phase, (active, reactive, apparent, power_factor) in PHASE_POWER_COLUMNS.items():
+        voltage, current = PHASE_COLUMNS[phase]
+        s = values[_column(voltage)] * values[_column(current)]
+        values[_column(apparent)] = s
+        values[_column(active)] = s * NOMINAL["power_factor"]
+        values[_column(reactive)] = s * (1 - NOMINAL["power_factor"] ** 2) ** 0.5
+        values[_column(power_factor)] = NOMINAL["power_factor"]
+    return values
+
+def synthetic_samples(scenario, rate, fault_after, fault_duration):
+    """Yields (seconds since start, values) at rate Hz, forever."""
+    for n in itertools.count():
+        elapsed = n / rate
+        faulted = fault_after <= elapsed < fault_after + fault_duration
+        yield elapsed, synthetic_sample(scenario, faulted)
+
+def recorded_samples(path):
+    """Yields (seconds since the first row, values) from a power log CSV or .csv.gz segment."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Header
+        start = None
+        for row in reader:
+            if not row or len(row) != VALUE_COUNT + 1:
+                continue
+            values = parse_values(row[1:])
+            if values is None:
+                continue
+            when = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S.%f").timestamp()
+            if start is None:
+                start = when
+            yield when - start, values
+
+def looped_samples(path):
+    """Recording samples repeated end to end, with timestamps continuing across passes."""
+    base = 0.0
+    while True:
+        offset = None
+        for offset, values in recorded_samples(path):
+            yield base + offset, values
+        if offset is None:
+            return  # Nothing to replay
+        base += offset + 1.0  # One sample period (assumed 1 s) between passes
+
+def encode_line(values):
+    return (",".join(f"{v:.3f}" for v in values) + "\r\n").encode()
+
+def corrupt(data):
+    """Damages one sample the way a noisy link would: a flipped byte or a cut-off line."""
+    data = bytearray(data)
+    if random.random() < 0.5:
+        data[random.randrange(len(data))] ^= 0x41
+        return bytes(data)
+    return bytes(data[:random.randrange(1, len(data))])
+
+def open_pty(link=None):
+    """Creates a raw pseudo-terminal. Returns (master_fd, slave_path, slave_fd)."""
+    master, slave = os.openpty()
+    tty.setraw(slave)  # No echo or newline translation, like a USB serial device
+    slave_path = os.ttyname(slave)
+    if link:
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(slave_path, link)
+    # Keep the slave open ourselves so the master does not see a hang-up between readers
+    return master, slave_path, slave
+
+def replay(master, samples, speed, protocol, corrupt_rate=0.0, limit=None):
+    """Writes samples to the pty master, paced by their timestamps divided by speed (0 = max speed)."""
+    encode = encode_frame if protocol == "binary" else encode_line
+    sent = errors = written = 0
+    started = time.monotonic()
+    last_report = started
+    for offset, values in samples:
+        if speed > 0:
+            delay = started + offset / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        data = encode(values)
+        if corrupt_rate and random.random() < corrupt_rate:
+            data = corrupt(data)
+            errors += 1
+        os.write(master, data)  # Blocks when the reader falls behind, like a full UART buffer
+        sent += 1
+        written += len(data)
+
+        now = time.monotonic()
+        if now - last_report >= 5:
+            print(f"Sent {sent} samples ({sent / (now - started):.1f}/s, {written / (now - started) / 1024:.1f} KiB/s), "
+                  f"{errors} corrupted")
+            last_report = now
+        if limit and sent >= limit:
+            break
+    elapsed = time.monotonic() - started
+    print(f"Done: {sent} samples in {elapsed:.1f} s ({sent / max(elapsed, 1e-9):.1f}/s), {errors} corrupted")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay meter data into a pseudo-terminal")
+    parser.add_argument("recording", nargs="?", help="power_log CSV (or .csv.gz) to replay")
+    parser.add_argument("--synthetic", choices=sorted(SCENARIOS), help="generate a scenario instead of a recording")
+    parser.add_argument("--rate", type=float, default=1.0, help="synthetic samples per second (default 1)")
+    parser.add_argument("--fault-after", type=float, default=10.0, help="seconds before the synthetic fault starts")
+    parser.add_argument("--fault-duration", type=float, default=10.0, help="seconds the synthetic fault lasts")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N times faster, 0 = max speed")
+    parser.add_argument("--protocol", choices=("ascii", "binary"), default="ascii")
+    parser.add_argument("--corrupt", type=float, default=0.0, metavar="RATE", help="fraction of samples to damage")
+    parser.add_argument("--loop", action="store_true", help="replay the recording over and over")
+    parser.add_argument("--count", type=int, help="stop after this many samples")
+    parser.add_argument("--link", help="also expose the pty at this path, e.g. /tmp/meter_input")
+    args = parser.parse_args()
+    if bool(args.recording) == bool(args.synthetic):
+        parser.error("give either a recording or --synthetic")
+
+    if args.synthetic:
+        samples = synthetic_samples(args.synthetic, args.rate, args.fault_after, args.fault_duration)
+    elif args.loop:
+        samples = looped_samples(args.recording)
+    else:
+        samples = recorded_samples(args.recording)
+
+    master, slave_path, slave = open_pty(args.link)
+    print(f"Meter pty: {slave_path}" + (f" (linked at {args.link})" if args.link else ""))
+    try:
+        replay(master, samples, args.speed, args.protocol, args.corrupt, args.count)
+        print("Press CTRL+C to close the pty.")
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+
+if __name__ == "__main__":
+    main()
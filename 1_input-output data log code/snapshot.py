@@ -0,0 +1,34 @@
+import csv
+import io
+import os
+
+def serialize_snapshot(headers, row):
+    """Header line plus one data row, formatted the way csv.writer writes them."""
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    writer.writerow(row)
+    return buffer.getvalue().encode()
+
+def publish_snapshot(paths, content):
+    """Atomically replaces every file in paths with content.
+
+    The snapshot is written once, to a temp file next to the first path, and
+    every other path gets a hard link to it before each name is swapped in
+    with os.replace. A reader therefore always opens either the previous
+    snapshot or the new one in full, and the cost does not grow with the
+    number of files or readers.
+    """
+    first = paths[0]
+    temp_path = f"{first}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    for path in paths[1:]:
+        link_path = f"{path}.tmp"
+        try:
+            os.remove(link_path)
+        except FileNotFoundError:
+            pass
+        os.link(temp_path, link_path)
+        os.replace(link_path, path)
+    os.replace(temp_path, first)
@@ -1,9 +1,26 @@
-import Jetson.GPIO as GPIO
-from datetime import datetime
 import openpyxl
 import time
 import csv
 import os
+import signal
+import sys
+
+if os.environ.get("RELAY_GPIO") == "mock":  # Run without Jetson hardware
+    from mock_gpio import GPIO
+else:
+    import Jetson.GPIO as GPIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Shared modules at the project root
+from sample_ring import INPUT_RING_PATH, OUTPUT_RING_PATH, SAMPLE_FIELDS, TIME_COUNT, ACQUIRED, RingReader, RingWatcher
+from sample_schema import read_last_sample
+from protection import INPUT, OUTPUT, BOTH, ElementTable, ProtectionState, read_measurements
+from sample_watcher import create_waiter
+from settings_cache import SETTINGS_FIELDS, SettingsCache
+from fault_writer import FAULT_LOG_HEADERS, FaultLogWriter
+from buttons import RESET_PRESSED, TRIP_HELD, ButtonMonitor
+from latency import EVALUATION, GPIO_WRITE, TRIP_TOTAL, LatencyMonitor
 
 def setup_pins(input_trip_pin, output_trip_pin,led_input,led_output,relay_active,trip_button_pin=None, reset_button_pin=None):
     GPIO.setmode(GPIO.BOARD)
@@ -34,7 +51,7 @@ def create_fault_log():
         workbook = openpyxl.Workbook()
         sheet = workbook.active
         sheet.title = "Fault Log"
-        sheet.append(["Timestamp", "Relay Status", "Input Status", "Output Status", "Circuit Breaker Status", "Fault Type"])
+        sheet.append(FAULT_LOG_HEADERS)
         workbook.save(fault_log_file)
         workbook.close()
         print(f"✅ Created fault log Excel file: {fault_log_file}")
@@ -42,254 +59,55 @@ def create_fault_log():
     if not os.path.exists(fault_csv_file):
         with open(fault_csv_file, mode='w', newline='') as file:
             writer = csv.writer(file)
-            writer.writerow(["Timestamp", "Relay Status", "Input Status", "Output Status", "Circuit Breaker Status", "Fault Type"])
+            writer.writerow(FAULT_LOG_HEADERS)
         print(f"✅ Created fault log CSV file: {fault_csv_file}")
 
-def update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type):
-    """Updates Excel (real-time) and CSV (fault occurrences)."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # 1️⃣ Update Excel (overwrite previous data)
-    try:
-        if os.path.exists(fault_log_file):
-            workbook = openpyxl.load_workbook(fault_log_file)
-            sheet = workbook.active
-            # Clear all rows except header
-            if sheet.max_row > 1:
-                sheet.delete_rows(2, sheet.max_row - 1)
-        else:
-            workbook = openpyxl.Workbook()
-            sheet = workbook.active
-            sheet.title = "Fault Log"
-            sheet.append(["Timestamp", "Relay Status", "Input Status", "Output Status", "Circuit Breaker Status", "Fault Type"])
-        
-        # Append current status
-        sheet.append([timestamp, relay_status, input_status, output_status, breaker_status, fault_type])
-        workbook.save(fault_log_file)
-        workbook.close()
-    except Exception as e:
-        print(f"Excel Update Error: {e}")
+def update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type, tripped_at=None):
+    """Queues a status update for the Excel (real-time) and CSV (status changes) logs.
 
-    # 2️⃣ Append to CSV only if there's a fault
-    if fault_type != "None":
-        try:
-            with open(fault_csv_file, mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([timestamp, relay_status, input_status, output_status, breaker_status, fault_type])
-            print(f"✅ Logged fault: {fault_type} at {timestamp}")
-        except Exception as e:
-            print(f"CSV Append Error: {e}")
+    The files are written by the background fault_writer, so this never blocks
+    the protection loop on disk I/O. tripped_at is the monotonic_ns stamp of the
+    trip outputs, used for the fault log latency.
+    """
+    fault_writer.submit(relay_status, input_status, output_status, breaker_status, fault_type, tripped_at)
 
-
-def read_excel_cells(file_path, sheet_name, cells):
-    """Reads multiple cells from an Excel file and returns their values."""
+def request_log_flush(pid_file):
+    """Asks the acquisition daemon to flush its power logs (SIGUSR1), so the samples leading up to a trip reach disk."""
     try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook[sheet_name]
-       
-        # Explicitly assign values
-        input_phase_a_over_current_status = sheet[cells[0]].value  # B2
-        input_phase_a_over_current_set_value = sheet[cells[1]].value  # B3
-        input_phase_b_over_current_status = sheet[cells[2]].value  # B4
-        input_phase_b_over_current_set_value = sheet[cells[3]].value
-        input_phase_c_over_current_status = sheet[cells[4]].value
-        input_phase_c_over_current_set_value = sheet[cells[5]].value
-        input_phase_a_over_voltage_status = sheet[cells[6]].value
-        input_phase_a_over_voltage_set_value = sheet[cells[7]].value
-        input_phase_b_over_voltage_status = sheet[cells[8]].value
-        input_phase_b_over_voltage_set_value = sheet[cells[9]].value
-        input_phase_c_over_voltage_status = sheet[cells[10]].value
-        input_phase_c_over_voltage_set_value = sheet[cells[11]].value
-        input_phase_a_under_voltage_status = sheet[cells[12]].value
-        input_phase_a_under_voltage_set_value = sheet[cells[13]].value
-        input_phase_b_under_voltage_status = sheet[cells[14]].value
-        input_phase_b_under_voltage_set_value = sheet[cells[15]].value
-        input_phase_c_under_voltage_status = sheet[cells[16]].value
-        input_phase_c_under_voltage_set_value = sheet[cells[17]].value
-        input_over_frequency_status = sheet[cells[18]].value
-        input_over_frequency_set_value = sheet[cells[19]].value
-        input_under_frequency_status = sheet[cells[20]].value
-        input_under_frequency_set_value = sheet[cells[21]].value
-        input_dc_over_voltage_status = sheet[cells[22]].value
-        input_dc_over_voltage_set_value = sheet[cells[23]].value
-        input_dc_under_voltage_status = sheet[cells[24]].value
-        input_dc_under_voltage_set_value = sheet[cells[25]].value
-        input_dc_over_current_status = sheet[cells[26]].value
-        input_dc_over_current_set_value = sheet[cells[27]].value
-        input_over_temperature_status = sheet[cells[28]].value
-        input_over_temperature_set_value = sheet[cells[29]].value
-        output_phase_a_over_current_status = sheet[cells[30]].value
-        output_phase_a_over_current_set_value = sheet[cells[31]].value  
-        output_phase_b_over_current_status = sheet[cells[32]].value
-        output_phase_b_over_current_set_value = sheet[cells[33]].value
-        output_phase_c_over_current_status = sheet[cells[34]].value
-        output_phase_c_over_current_set_value = sheet[cells[35]].value
-        output_phase_a_over_voltage_status = sheet[cells[36]].value
-        output_phase_a_over_voltage_set_value = sheet[cells[37]].value
-        output_phase_b_over_voltage_status = sheet[cells[38]].value
-        output_phase_b_over_voltage_set_value = sheet[cells[39]].value
-        output_phase_c_over_voltage_status = sheet[cells[40]].value
-        output_phase_c_over_voltage_set_value = sheet[cells[41]].value
-        output_phase_a_under_voltage_status = sheet[cells[42]].value
-        output_phase_a_under_voltage_set_value = sheet[cells[43]].value
-        output_phase_b_under_voltage_status = sheet[cells[44]].value
-        output_phase_b_under_voltage_set_value = sheet[cells[45]].value
-        output_phase_c_under_voltage_status = sheet[cells[46]].value
-        output_phase_c_under_voltage_set_value = sheet[cells[47]].value
-        output_over_frequency_status = sheet[cells[48]].value
-        output_over_frequency_set_value = sheet[cells[49]].value
-        output_under_frequency_status = sheet[cells[50]].value
-        output_under_frequency_set_value = sheet[cells[51]].value
-        output_dc_over_voltage_status = sheet[cells[52]].value
-        output_dc_over_voltage_set_value = sheet[cells[53]].value
-        output_dc_under_voltage_status = sheet[cells[54]].value
-        output_dc_under_voltage_set_value = sheet[cells[55]].value
-        output_dc_over_current_status = sheet[cells[56]].value
-        output_dc_over_current_set_value = sheet[cells[57]].value
-        output_over_temperature_status = sheet[cells[58]].value
-        output_over_temperature_set_value = sheet[cells[59]].value
-        Instantaneous_Trip_Characteristics_status = sheet[cells[60]].value
-        Inverse_Time_Characteristics_status = sheet[cells[61]].value
-        Definite_Time_Characteristics_status = sheet[cells[62]].value
-        Differential_Relay_Characteristics_status = sheet[cells[63]].value
-        Trip_button = sheet[cells[64]].value
-        Reset_button = sheet[cells[65]].value  
-
-
-        workbook.close()
-        return (input_phase_a_over_current_status, input_phase_a_over_current_set_value , 
-                input_phase_b_over_current_status, input_phase_b_over_current_set_value,
-                input_phase_c_over_current_status,input_phase_c_over_current_set_value,
-                input_phase_a_over_voltage_status,input_phase_a_over_voltage_set_value ,
-                input_phase_b_over_voltage_status,input_phase_b_over_voltage_set_value,
-                input_phase_c_over_voltage_status ,input_phase_c_over_voltage_set_value,
-                input_phase_a_under_voltage_status ,input_phase_a_under_voltage_set_value,
-                input_phase_b_under_voltage_status,input_phase_b_under_voltage_set_value,
-                input_phase_c_under_voltage_status,input_phase_c_under_voltage_set_value,
-                input_over_frequency_status,input_over_frequency_set_value,input_under_frequency_status,
-                input_under_frequency_set_value,input_dc_over_voltage_status,input_dc_over_voltage_set_value,
-                input_dc_under_voltage_status,input_dc_under_voltage_set_value,input_dc_over_current_status,
-                input_dc_over_current_set_value,input_over_temperature_status,input_over_temperature_set_value,
-                output_phase_a_over_current_status,output_phase_a_over_current_set_value,output_phase_b_over_current_status,
-                output_phase_b_over_current_set_value,output_phase_c_over_current_status,output_phase_c_over_current_set_value,
-                output_phase_a_over_voltage_status,output_phase_a_over_voltage_set_value,output_phase_b_over_voltage_status,
-                output_phase_b_over_voltage_set_value,output_phase_c_over_voltage_status,output_phase_c_over_voltage_set_value,
-                output_phase_a_under_voltage_status,output_phase_a_under_voltage_set_value,output_phase_b_under_voltage_status,
-                output_phase_b_under_voltage_set_value,output_phase_c_under_voltage_status,output_phase_c_under_voltage_set_value,
-                output_over_frequency_status,output_over_frequency_set_value,output_under_frequency_status,output_under_frequency_set_value,
-                output_dc_over_voltage_status,output_dc_over_voltage_set_value,output_dc_under_voltage_status,output_dc_under_voltage_set_value,
-                output_dc_over_current_status,output_dc_over_current_set_value,output_over_temperature_status,output_over_temperature_set_value,
-                Instantaneous_Trip_Characteristics_status,Inverse_Time_Characteristics_status,Definite_Time_Characteristics_status,
-                Differential_Relay_Characteristics_status,Trip_button,Reset_button)
-
-
-    except Exception as e:
-        print(f"Excel Read Error: {e}")
-        return (None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,
-                None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,
-                None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None,None)
+        with open(pid_file) as f:
+            pid = int(f.read())
+        os.kill(pid, signal.SIGUSR1)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not signal the acquisition daemon to flush its logs: {e}")
 
 def read_input_csv(file_path):
-    """Reads values from the second row of the input CSV file."""
+    """Reads the latest sample from the input real-time CSV file."""
     try:
-        with open(file_path, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip the header row
-            row = next(reader, None)  # Read the second row
-
-            if row:
-                # Assign input values explicitly
-                input_Computer_TS = row[0]  # B2
-                input_A_Phase_Voltage = row[1]  # C2
-                input_A_Phase_Current = row[2]  # D2
-                input_A_Phase_Active_Power = row[3]  # E2
-                input_A_Phase_Reactive_Power = row[4]  # F2
-                input_A_Phase_Apparent_Power = row[5]  # G2
-                input_A_Power_Factor = row[6]  # H2
-                input_B_Phase_Voltage = row[7]  # I2
-                input_B_Phase_Current = row[8]  # J2
-                input_B_Phase_Active_Power = row[9]  # K2
-                input_B_Phase_Reactive_Power = row[10]  # L2
-                input_B_Phase_Apparent_Power = row[11]  # M2
-                input_B_Power_Factor = row[12]  # N2
-                input_C_Phase_Voltage = row[13]  # O2
-                input_C_Phase_Current = row[14]  # P2
-                input_C_Phase_Active_Power = row[15]  # Q2
-                input_C_Phase_Reactive_Power = row[16]  # R2
-                input_C_Phase_Apparent_Power = row[17]  # S2
-                input_C_Power_Factor = row[18]  # T2
-                input_Frequency = row[19]  # U2
-                input_DC_Voltage = row[20]  # V2
-                input_DC_Current = row[21]  # W2
-                input_Temperature = row[22]  # X2
-
-                return (input_Computer_TS, input_A_Phase_Voltage, input_A_Phase_Current, input_A_Phase_Active_Power, 
-                        input_A_Phase_Reactive_Power, input_A_Phase_Apparent_Power, input_A_Power_Factor, 
-                        input_B_Phase_Voltage, input_B_Phase_Current, input_B_Phase_Active_Power, 
-                        input_B_Phase_Reactive_Power, input_B_Phase_Apparent_Power, input_B_Power_Factor, 
-                        input_C_Phase_Voltage, input_C_Phase_Current, input_C_Phase_Active_Power, 
-                        input_C_Phase_Reactive_Power, input_C_Phase_Apparent_Power, input_C_Power_Factor, 
-                        input_Frequency, input_DC_Voltage, input_DC_Current, input_Temperature)
-
-            else:
-                return (None, None, None, None, None, None, None, None, None, None, None, None, None, None, None,
-                         None, None, None, None, None, None, None, None)
-
+        return read_last_sample(file_path)
     except Exception as e:
         print(f"Input CSV Read Error: {e}")
-        return None, None, None, None
+        return None
 
 def read_output_csv(file_path):
-    """Reads values from the second row of the output CSV file."""
+    """Reads the latest sample from the output real-time CSV file."""
     try:
-        with open(file_path, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip the header row
-            row = next(reader, None)  # Read the second row
-
-            if row:
-                # Assign output values explicitly
-                output_Computer_TS = row[0]  # B2
-                output_A_Phase_Voltage = row[1]  # C2
-                output_A_Phase_Current = row[2]  # D2
-                output_A_Phase_Active_Power = row[3]  # E2
-                output_A_Phase_Reactive_Power = row[4]  # F2
-                output_A_Phase_Apparent_Power = row[5]  # G2
-                output_A_Power_Factor = row[6]  # H2
-                output_B_Phase_Voltage = row[7]  # I2
-                output_B_Phase_Current = row[8]  # J2
-                output_B_Phase_Active_Power = row[9]  # K2
-                output_B_Phase_Reactive_Power = row[10]  # L2
-                output_B_Phase_Apparent_Power = row[11]  # M2
-                output_B_Power_Factor = row[12]  # N2
-                output_C_Phase_Voltage = row[13]  # O2
-                output_C_Phase_Current = row[14]  # P2
-                output_C_Phase_Active_Power = row[15]  # Q2
-                output_C_Phase_Reactive_Power = row[16]  # R2
-                output_C_Phase_Apparent_Power = row[17]  # S2
-                output_C_Power_Factor = row[18]  # T2
-                output_Frequency = row[19]  # U2
-                output_DC_Voltage = row[20]  # V2
-                output_DC_Current = row[21]  # W2
-                output_Temperature = row[22]  # X2
-
-                return (output_Computer_TS, output_A_Phase_Voltage, output_A_Phase_Current, output_A_Phase_Active_Power, 
-                        output_A_Phase_Reactive_Power, output_A_Phase_Apparent_Power, output_A_Power_Factor, 
-                        output_B_Phase_Voltage, output_B_Phase_Current, output_B_Phase_Active_Power, 
-                        output_B_Phase_Reactive_Power, output_B_Phase_Apparent_Power, output_B_Power_Factor, 
-                        output_C_Phase_Voltage, output_C_Phase_Current, output_C_Phase_Active_Power, 
-                        output_C_Phase_Reactive_Power, output_C_Phase_Apparent_Power, output_C_Power_Factor, 
-                        output_Frequency, output_DC_Voltage, output_DC_Current, output_Temperature)
-            else:
-                return (None, None, None, None, None, None, None, None, None, None, None, None, None, None, None,
-                         None, None, None, None, None, None, None, None)
-
+        return read_last_sample(file_path)
     except Exception as e:
         print(f"Output CSV Read Error: {e}")
-        return None, None, None, None
+        return None
+
+def monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv, input_trip_pin=11, output_trip_pin=12, interval=1, wait_mode="event",
+                  input_ring=None, output_ring=None):
+    """Continuously reads Excel and CSV files, updates variables, and performs checks.
+
+    With wait_mode="event" the loop wakes as soon as a new sample lands in either
+    real-time file and falls back to checking every `interval` seconds when idle.
+    wait_mode="poll" keeps the original fixed-interval loop.
 
-def monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv, input_trip_pin=11, output_trip_pin=12, interval=1):
-    """Continuously reads Excel and CSV files, updates variables, and performs checks."""
+    If input_ring/output_ring are given, samples are read from the loggers'
+    shared-memory rings instead, with the CSV files as fallback for a side
+    whose ring is not available.
+    """
     input_trip_pin = 11  # Input Relay Pin
     output_trip_pin = 12 # Output Relay Pin
     led_input = 15  # Input Trip Indication
@@ -299,52 +117,38 @@ def monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv, in
     reset_button_pin = 22  # reset button pin
 
     setup_pins(input_trip_pin, output_trip_pin, led_input, led_output, relay_active, trip_button_pin, reset_button_pin)
-    trip_button_pressed_time = None  # Track trip button press duration
+    protection_state = ProtectionState()
+    ring_readers = None
+    ring_records = np.empty((2, SAMPLE_FIELDS))
+    sample_times = np.zeros((2, TIME_COUNT), dtype=np.int64)  # Logger stamps of the ring records
+    sample_sequences = [None, None]
+    if input_ring and output_ring:
+        ring_readers = (RingReader(input_ring), RingReader(output_ring))
+    if ring_readers and wait_mode == "event":
+        waiter = RingWatcher(ring_readers)
+    else:
+        waiter = create_waiter([input_csv, output_csv], wait_mode)
+    csv_readers = (lambda: read_input_csv(input_csv), lambda: read_output_csv(output_csv))
+    settings_cache = SettingsCache(excel_path, sheet_name, excel_cells)
+    compiled_settings = None
+    was_tripped = False
+    # Trip needs a 3-second hold, reset acts on press; both wake the loop immediately
+    buttons = ButtonMonitor(GPIO, trip_button_pin, reset_button_pin, hold_time=3, on_action=waiter.wake).start()
     
     try:
         while True:
-            # Read Excel file
-            (input_phase_a_over_current_status, input_phase_a_over_current_set_value , input_phase_b_over_current_status, 
-             input_phase_b_over_current_set_value,input_phase_c_over_current_status,input_phase_c_over_current_set_value,
-             input_phase_a_over_voltage_status,input_phase_a_over_voltage_set_value ,input_phase_b_over_voltage_status,
-             input_phase_b_over_voltage_set_value,input_phase_c_over_voltage_status ,input_phase_c_over_voltage_set_value,
-             input_phase_a_under_voltage_status ,input_phase_a_under_voltage_set_value, input_phase_b_under_voltage_status,
-             input_phase_b_under_voltage_set_value,input_phase_c_under_voltage_status,input_phase_c_under_voltage_set_value,
-             input_over_frequency_status,input_over_frequency_set_value,input_under_frequency_status,input_under_frequency_set_value,
-             input_dc_over_voltage_status,input_dc_over_voltage_set_value,input_dc_under_voltage_status,input_dc_under_voltage_set_value,
-             input_dc_over_current_status,input_dc_over_current_set_value,input_over_temperature_status,input_over_temperature_set_value,
-             output_phase_a_over_current_status,output_phase_a_over_current_set_value,output_phase_b_over_current_status,output_phase_b_over_current_set_value,
-             output_phase_c_over_current_status,output_phase_c_over_current_set_value,output_phase_a_over_voltage_status,output_phase_a_over_voltage_set_value,
-             output_phase_b_over_voltage_status,output_phase_b_over_voltage_set_value,output_phase_c_over_voltage_status,output_phase_c_over_voltage_set_value,
-             output_phase_a_under_voltage_status,output_phase_a_under_voltage_set_value,output_phase_b_under_voltage_status,output_phase_b_under_voltage_set_value,
-             output_phase_c_under_voltage_status,output_phase_c_under_voltage_set_value,output_over_frequency_status,output_over_frequency_set_value,output_under_frequency_status,
-             output_under_frequency_set_value,output_dc_over_voltage_status,output_dc_over_voltage_set_value,output_dc_under_voltage_status,output_dc_under_voltage_set_value,
-             output_dc_over_current_status,output_dc_over_current_set_value,output_over_temperature_status,output_over_temperature_set_value, Instantaneous_Trip_Characteristics_status,
-             Inverse_Time_Characteristics_status,Definite_Time_Characteristics_status,Differential_Relay_Characteristics_status,Trip_button,Reset_button) = read_excel_cells(excel_path, sheet_name, excel_cells)
-            
-            # Read Input CSV file
-            (input_Computer_TS, input_A_Phase_Voltage, input_A_Phase_Current, input_A_Phase_Active_Power, 
-            input_A_Phase_Reactive_Power, input_A_Phase_Apparent_Power, input_A_Power_Factor, 
-            input_B_Phase_Voltage, input_B_Phase_Current, input_B_Phase_Active_Power, 
-            input_B_Phase_Reactive_Power, input_B_Phase_Apparent_Power, input_B_Power_Factor, 
-            input_C_Phase_Voltage, input_C_Phase_Current, input_C_Phase_Active_Power, 
-            input_C_Phase_Reactive_Power, input_C_Phase_Apparent_Power, input_C_Power_Factor, 
-            input_Frequency, input_DC_Voltage, input_DC_Current, input_Temperature) = read_input_csv(input_csv)
-            
-            # Read Output CSV file
-            (output_Computer_TS, output_A_Phase_Voltage, output_A_Phase_Current, output_A_Phase_Active_Power, 
-            output_A_Phase_Reactive_Power, output_A_Phase_Apparent_Power, output_A_Power_Factor, 
-            output_B_Phase_Voltage, output_B_Phase_Current, output_B_Phase_Active_Power, 
-            output_B_Phase_Reactive_Power, output_B_Phase_Apparent_Power, output_B_Power_Factor, 
-            output_C_Phase_Voltage, output_C_Phase_Current, output_C_Phase_Active_Power, 
-            output_C_Phase_Reactive_Power, output_C_Phase_Apparent_Power, output_C_Power_Factor, 
-            output_Frequency, output_DC_Voltage, output_DC_Current, output_Temperature) = read_output_csv(output_csv)
+            # Read settings (the workbook is only re-parsed when it changes on disk)
+            settings = settings_cache.get()
+            if settings is not compiled_settings:
+                element_table = ElementTable(settings, protection_state)
+                compiled_settings = settings
+
+            # Read both meters into the 2x22 measurement vector
+            measurements = read_measurements(ring_readers, ring_records, csv_readers, sample_times, sample_sequences)
+            picked_up = time.monotonic_ns()
+            new_samples = [side for side in (INPUT, OUTPUT)
+                           if latency.record_sample(side, sample_sequences[side], sample_times[side], picked_up)]
 
-            # Print the extracted values for debuging
-            #print(f"Excel Data: input_phase_a_over_current_status={input_phase_b_over_current_status}")
-            #print(f"Input CSV Data: input1={input_B_Phase_Current}, input_phase_a_over_current_set_value={input_Temperature}, input3={input_DC_Current}, input4={input_B_Phase_Voltage}")
-            #print(f"Output CSV Data: output1={output_A_Phase_Voltage}, output2={output_B_Phase_Apparent_Power}, output3={output_Temperature}, output4={output_DC_Voltage}")
-            
                                     # Default healthy values (MISSING - ADD THIS)
             relay_status = "Healthy and Operational"
             input_status = "Healthy"
@@ -352,13 +156,9 @@ def monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv, in
             breaker_status = "Live"
             fault_type = "None"
             
-            # --- Add Trip Button Handling (3-second hold) ---
-            current_time = time.time()
-            trip_btn_state = GPIO.input(trip_button_pin)
-            if trip_btn_state == GPIO.LOW:  # Button pressed
-                if trip_button_pressed_time is None:
-                    trip_button_pressed_time = current_time  # Start timer
-                elif current_time - trip_button_pressed_time >= 3:  # Held for 3 seconds
+            # --- Trip (held 3 seconds) and reset button presses since the last pass ---
+            for action in buttons.poll():
+                if action == TRIP_HELD:
                     # Trip relays
                     GPIO.output(input_trip_pin, GPIO.HIGH)
                     GPIO.output(output_trip_pin, GPIO.HIGH)
@@ -369,28 +169,23 @@ def monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv, in
                     fault_type = "Manual Trip (Button)"
                     update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type)
                     print("button trip")
-                    trip_button_pressed_time = None  # Reset timer
-            else:
-                trip_button_pressed_time = None  # Button not pressed
-
-            # --- Add Reset Button Handling (immediate press) ---
-            reset_btn_state = GPIO.input(reset_button_pin)
-            if reset_btn_state == GPIO.LOW:
-                # Reset relays and statuses
-                GPIO.output(input_trip_pin, GPIO.LOW)
-                GPIO.output(output_trip_pin, GPIO.LOW)
-                GPIO.output(led_input, GPIO.LOW)
-                GPIO.output(led_output, GPIO.LOW)
-                relay_status = "Healthy and Operational"
-                input_status = "Healthy"
-                output_status = "Healthy"
-                breaker_status = "Rest"
-                fault_type = "Manual Rest"
-                update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type)
-                print("Reset physical button")
+                elif action == RESET_PRESSED:
+                    # Reset relays and statuses
+                    GPIO.output(input_trip_pin, GPIO.LOW)
+                    GPIO.output(output_trip_pin, GPIO.LOW)
+                    GPIO.output(led_input, GPIO.LOW)
+                    GPIO.output(led_output, GPIO.LOW)
+                    relay_status = "Healthy and Operational"
+                    input_status = "Healthy"
+                    output_status = "Healthy"
+                    breaker_status = "Rest"
+                    fault_type = "Manual Rest"
+                    protection_state.reset()
+                    update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type)
+                    print("Reset physical button")
 
   
-            if Trip_button == 1:
+            if settings.Trip_button == 1:
                 print("trip Button Activated")
                 GPIO.output(input_trip_pin, GPIO.HIGH)
                 GPIO.output(output_trip_pin, GPIO.HIGH)
@@ -400,1079 +195,71 @@ def monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv, in
                 breaker_status = "Trip"
                 fault_type = "Manual Trip"
 
-               # ========================= INTPUT RELAY LOGIC FOR INSTANTANEOUS TRIPING =========================
-             
-            if Instantaneous_Trip_Characteristics_status == 1:
-               
-               # Input Phase A Overcurrent
-               if input_phase_a_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-                  
-                  if input_A_Phase_Current is not None and input_phase_a_over_current_set_value is not None:
-                    try:
-                        input_A_Phase_Current = float(input_A_Phase_Current)
-                        input_phase_a_over_current_set_value = float(input_phase_a_over_current_set_value)
-
-                        if input_A_Phase_Current >= input_phase_a_over_current_set_value:
-                           print("trip on - Input Phase A Overcurrent")
-                           GPIO.output(input_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_input, GPIO.HIGH)
-                           input_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Input Phase A Overcurrent"
-                        
-                    except ValueError as e:
-                       print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Input Phase B Overcurrent
-               if input_phase_b_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-               
-                   if input_B_Phase_Current is not None and input_phase_b_over_current_set_value is not None:
-                   
-                    try:
-                       input_B_Phase_Current = float(input_B_Phase_Current)
-                       input_phase_b_over_current_set_value = float(input_phase_b_over_current_set_value)
-
-                       if input_B_Phase_Current >= input_phase_b_over_current_set_value:
-                          print("trip on - Input Phase B Overcurrent")
-                          GPIO.output(input_trip_pin, GPIO.HIGH)
-                          GPIO.output(led_input, GPIO.HIGH)
-                          input_status = "Unhealthy"
-                          breaker_status = "Trip"
-                          fault_type = "Input Phase B Overcurrent"
-                        
-                    except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Input Phase C Overcurrent
-               if input_phase_c_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-                  if input_C_Phase_Current is not None and input_phase_c_over_current_set_value is not None:
-                    try:
-                       input_C_Phase_Current = float(input_C_Phase_Current)
-                       input_phase_c_over_current_set_value = float(input_phase_c_over_current_set_value)
-                       if input_C_Phase_Current >= input_phase_c_over_current_set_value:
-                          print("trip on - Input Phase C Overcurrent")
-                          GPIO.output(input_trip_pin, GPIO.HIGH)
-                          GPIO.output(led_input, GPIO.HIGH)
-                          input_status = "Unhealthy"
-                          breaker_status = "Trip"
-                          fault_type = "Input Phase C Overcurrent"
-                        
-                    except ValueError as e:
-                      print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Input DC Over Current
-               if input_dc_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-                  if input_DC_Current is not None and input_dc_over_current_set_value is not None:
-                     try:
-                       input_DC_Current = float(input_DC_Current)
-                       input_dc_over_current_set_value = float(input_dc_over_current_set_value)
-                       if input_DC_Current >= input_dc_over_current_set_value:
-                         print("trip on - Input DC Over Current")
-                         GPIO.output(input_trip_pin, GPIO.HIGH)
-                         GPIO.output(led_input, GPIO.HIGH)
-                         input_status = "Unhealthy"
-                         breaker_status = "Trip"
-                         fault_type = "Input DC Overcurrent"
-                        
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                    # Input Over Temperature
-               if input_over_temperature_status == 1:
-                  if input_Temperature is not None and input_over_temperature_set_value is not None:
-                     try:
-                        input_Temperature = float(input_Temperature)
-                        input_over_temperature_set_value = float(input_over_temperature_set_value)
-                        if input_Temperature >= input_over_temperature_set_value:
-                           print("trip on - Input Over Temperature")
-                           GPIO.output(input_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_input, GPIO.HIGH)
-                           input_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Input Over Temperature"
-                        
-                     except ValueError as e:
-                           print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-               # Phase A Overvoltage
-               if input_phase_a_over_voltage_status == 1:
-                  if input_A_Phase_Voltage is not None and input_phase_a_over_voltage_set_value is not None:
-                     try:
-                        input_A_Phase_Voltage = float(input_A_Phase_Voltage)
-                        input_phase_a_over_voltage_set_value = float(input_phase_a_over_voltage_set_value)
-                        if input_A_Phase_Voltage >= input_phase_a_over_voltage_set_value:
-                          print("trip on - Input Phase A Overvoltage")
-                          GPIO.output(input_trip_pin, GPIO.HIGH)
-                          GPIO.output(led_input, GPIO.HIGH)
-                          input_status = "Unhealthy"
-                          breaker_status = "Trip"
-                          fault_type = "Input Phase A Overvoltage"
-                        
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-               # Phase B Overvoltage
-               if input_phase_b_over_voltage_status == 1:
-                  if input_B_Phase_Voltage is not None and input_phase_b_over_voltage_set_value is not None:
-                     try:
-                       input_B_Phase_Voltage = float(input_B_Phase_Voltage)
-                       input_phase_b_over_voltage_set_value = float(input_phase_b_over_voltage_set_value)
-                       if input_B_Phase_Voltage >= input_phase_b_over_voltage_set_value:
-                          print("trip on - Input Phase B Overvoltage")
-                          GPIO.output(input_trip_pin, GPIO.HIGH)
-                          GPIO.output(led_input, GPIO.HIGH)
-                          input_status = "Unhealthy"
-                          breaker_status = "Trip"
-                          fault_type = "Input Phase B Overvoltage"
-                       
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-               # Phase C Overvoltage
-               if input_phase_c_over_voltage_status == 1:
-                  if input_C_Phase_Voltage is not None and input_phase_c_over_voltage_set_value is not None:
-                     try:
-                        input_C_Phase_Voltage = float(input_C_Phase_Voltage)
-                        input_phase_c_over_voltage_set_value = float(input_phase_c_over_voltage_set_value)
-                        if input_C_Phase_Voltage >= input_phase_c_over_voltage_set_value:
-                          print("trip on - Input Phase C Overvoltage")
-                          GPIO.output(input_trip_pin, GPIO.HIGH)
-                          GPIO.output(led_input, GPIO.HIGH)
-                          input_status = "Unhealthy"
-                          breaker_status = "Trip"
-                          fault_type = "Input Phase C Overvoltage"
-                        
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Phase A Undervoltage
-               if input_phase_a_under_voltage_status == 1:
-                  if input_A_Phase_Voltage is not None and input_phase_a_under_voltage_set_value is not None:
-                     try:
-                        input_A_Phase_Voltage = float(input_A_Phase_Voltage)
-                        input_phase_a_under_voltage_set_value = float(input_phase_a_under_voltage_set_value)
-                        if input_A_Phase_Voltage <= input_phase_a_under_voltage_set_value:
-                           print("trip on - Input Phase A Undervoltage")
-                           GPIO.output(input_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_input, GPIO.HIGH)
-                           input_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Input Phase A Undervoltage"
-                        
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Phase B Undervoltage
-               if input_phase_b_under_voltage_status == 1:
-                  if input_B_Phase_Voltage is not None and input_phase_b_under_voltage_set_value is not None:
-                     try:
-                        input_B_Phase_Voltage = float(input_B_Phase_Voltage)
-                        input_phase_b_under_voltage_set_value = float(input_phase_b_under_voltage_set_value)
-                        if input_B_Phase_Voltage <= input_phase_b_under_voltage_set_value:
-                           print("trip on - Input Phase B Undervoltage")
-                           GPIO.output(input_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_input, GPIO.HIGH)
-                           input_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Input Phase B Undervoltage"
-                        
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-               # Phase C Undervoltage
-               if input_phase_c_under_voltage_status == 1:
-                  if input_C_Phase_Voltage is not None and input_phase_c_under_voltage_set_value is not None:
-                     try:
-                        input_C_Phase_Voltage = float(input_C_Phase_Voltage)
-                        input_phase_c_under_voltage_set_value = float(input_phase_c_under_voltage_set_value)
-                        if input_C_Phase_Voltage <= input_phase_c_under_voltage_set_value:
-                          print("trip on - Input Phase C Undervoltage")
-                          GPIO.output(input_trip_pin, GPIO.HIGH)
-                          GPIO.output(led_input, GPIO.HIGH)
-                          input_status = "Unhealthy"
-                          breaker_status = "Trip"
-                          fault_type = "Input Phase C Undervoltage"
-                        
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-               # Input DC Over Voltage
-               if input_dc_over_voltage_status == 1:
-                  if input_DC_Voltage is not None and input_dc_over_voltage_set_value is not None:
-                     try:
-                       input_DC_Voltage = float(input_DC_Voltage)
-                       input_dc_over_voltage_set_value = float(input_dc_over_voltage_set_value)
-                       if input_DC_Voltage >= input_dc_over_voltage_set_value:
-                         print("trip on - Input DC Over Voltage")
-                         GPIO.output(input_trip_pin, GPIO.HIGH)
-                         GPIO.output(led_input, GPIO.HIGH)
-                         input_status = "Unhealthy"
-                         breaker_status = "Trip"
-                         fault_type = "Input DC Over Voltage"
-                       
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Input DC Under Voltage
-               if input_dc_under_voltage_status == 1:
-                  if input_DC_Voltage is not None and input_dc_under_voltage_set_value is not None:
-                     try:
-                       input_DC_Voltage = float(input_DC_Voltage)
-                       input_dc_under_voltage_set_value = float(input_dc_under_voltage_set_value)
-                       if input_DC_Voltage <= input_dc_under_voltage_set_value:
-                         print("trip on - Input DC Under Voltage")
-                         GPIO.output(input_trip_pin, GPIO.HIGH)
-                         GPIO.output(led_input, GPIO.HIGH)
-                         input_status = "Unhealthy"
-                         breaker_status = "Trip"
-                         fault_type = "Input DC Under Voltage"
-                       
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Over Frequency
-               if input_over_frequency_status == 1:
-                  if input_Frequency is not None and input_over_frequency_set_value is not None:
-                     try:
-                        input_Frequency = float(input_Frequency)
-                        input_over_frequency_set_value = float(input_over_frequency_set_value)
-                        if input_Frequency >= input_over_frequency_set_value:
-                           print("trip on - Input Over Frequency")
-                           GPIO.output(input_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_input, GPIO.HIGH)
-                           input_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Input Over Frequency"
-                        
-                     except ValueError as e:
-                           print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Under Frequency
-               if input_under_frequency_status == 1:
-                  if input_Frequency is not None and input_under_frequency_set_value is not None:
-                     try:
-                        input_Frequency = float(input_Frequency)
-                        input_under_frequency_set_value = float(input_under_frequency_set_value)
-                        if input_Frequency <= input_under_frequency_set_value:
-                           print("trip on - Input Under Frequency")
-                           GPIO.output(input_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_input, GPIO.HIGH)
-                           input_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Input Under Frequency"
-                        
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-
-             # ========================= OUTPUT RELAY LOGIC FOR INSTANTANEOUS TRIPING =========================
-
-                #   Output Phase A Overcurrent
-               if output_phase_a_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-                  if output_A_Phase_Current is not None and output_phase_a_over_current_set_value is not None:
-                     try:
-                         output_A_Phase_Current = float(output_A_Phase_Current)
-                         output_phase_a_over_current_set_value = float(output_phase_a_over_current_set_value)
-                         if output_A_Phase_Current >= output_phase_a_over_current_set_value:
-                            print("trip on - Output Phase A Overcurrent")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output Phase A Overcurrent"
-                         
-                     except ValueError as e:
-                            print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Phase B Overcurrent
-               if output_phase_b_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-                  if output_B_Phase_Current is not None and output_phase_b_over_current_set_value is not None:
-                     try:
-                         output_B_Phase_Current = float(output_B_Phase_Current)
-                         output_phase_b_over_current_set_value = float(output_phase_b_over_current_set_value)
-                         if output_B_Phase_Current >= output_phase_b_over_current_set_value:
-                            print("trip on - Output Phase B Overcurrent")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output Phase B Overcurrent"
-                         
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Phase C Overcurrent
-               if output_phase_c_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-                  if output_C_Phase_Current is not None and output_phase_c_over_current_set_value is not None:
-                      try:
-                         output_C_Phase_Current = float(output_C_Phase_Current)
-                         output_phase_c_over_current_set_value = float(output_phase_c_over_current_set_value)
-                         if output_C_Phase_Current >= output_phase_c_over_current_set_value:
-                            print("trip on - Output Phase C Overcurrent")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output Phase C Overcurrent"
-                         
-                      except ValueError as e:
-                           print(f"Conversion Error: {e} - Check if output values are valid numbers.")
- 
-                # DC Over Current
-               if output_dc_over_current_status == 1 and Inverse_Time_Characteristics_status == 0:
-                  if output_DC_Current is not None and output_dc_over_current_set_value is not None:
-                     try:
-                         output_DC_Current = float(output_DC_Current)
-                         output_dc_over_current_set_value = float(output_dc_over_current_set_value)
-                         if output_DC_Current >= output_dc_over_current_set_value:
-                            print("trip on - Output DC Over Current")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output DC Over Current"
-                         
-                     except ValueError as e:
-                            print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Over Temperature
-               if output_over_temperature_status == 1:
-                  if output_Temperature is not None and output_over_temperature_set_value is not None:
-                     try:
-                        output_Temperature = float(output_Temperature)
-                        output_over_temperature_set_value = float(output_over_temperature_set_value)
-                        if output_Temperature >= output_over_temperature_set_value:
-                           print("trip on - Output Over Temperature")
-                           GPIO.output(output_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_output, GPIO.HIGH)
-                           output_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Output Over Temperature"
-                        
-                     except ValueError as e:
-                            print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-
-                # Phase A Overvoltage
-               if output_phase_a_over_voltage_status == 1:
-                  if output_A_Phase_Voltage is not None and output_phase_a_over_voltage_set_value is not None:
-                     try:
-                        output_A_Phase_Voltage = float(output_A_Phase_Voltage)
-                        output_phase_a_over_voltage_set_value = float(output_phase_a_over_voltage_set_value)
-                        if output_A_Phase_Voltage >= output_phase_a_over_voltage_set_value:
-                           print("trip on - Output Phase A Overvoltage")
-                           GPIO.output(output_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_output, GPIO.HIGH)
-                           output_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Output Phase A Overvoltage"
-                        
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Phase B Overvoltage
-               if output_phase_b_over_voltage_status == 1:
-                   if output_B_Phase_Voltage is not None and output_phase_b_over_voltage_set_value is not None:
-                      try:
-                          output_B_Phase_Voltage = float(output_B_Phase_Voltage)
-                          output_phase_b_over_voltage_set_value = float(output_phase_b_over_voltage_set_value)
-                          if output_B_Phase_Voltage >= output_phase_b_over_voltage_set_value:
-                            print("trip on - Output Phase B Overvoltage")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output Phase B Overvoltage"
-                          
-                      except ValueError as e:
-                           print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Phase C Overvoltage
-               if output_phase_c_over_voltage_status == 1:
-                   if output_C_Phase_Voltage is not None and output_phase_c_over_voltage_set_value is not None:
-                      try:
-                          output_C_Phase_Voltage = float(output_C_Phase_Voltage)
-                          output_phase_c_over_voltage_set_value = float(output_phase_c_over_voltage_set_value)
-                          if output_C_Phase_Voltage >= output_phase_c_over_voltage_set_value:
-                             print("trip on - Output Phase C Overvoltage")
-                             GPIO.output(output_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_output, GPIO.HIGH)
-                             output_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Output Phase C Overvoltage"
-                         
-                      except ValueError as e:
-                              print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Phase A Undervoltage
-               if output_phase_a_under_voltage_status == 1:
-                  if output_A_Phase_Voltage is not None and output_phase_a_under_voltage_set_value is not None:
-                     try:
-                         output_A_Phase_Voltage = float(output_A_Phase_Voltage)
-                         output_phase_a_under_voltage_set_value = float(output_phase_a_under_voltage_set_value)
-                         if output_A_Phase_Voltage <= output_phase_a_under_voltage_set_value:
-                               print("trip on - Output Phase A Undervoltage")
-                               GPIO.output(output_trip_pin, GPIO.HIGH)
-                               GPIO.output(led_output, GPIO.HIGH)
-                               output_status = "Unhealthy"
-                               breaker_status = "Trip"
-                               fault_type = "Output Phase A Undervoltage"
-                        
-                     except ValueError as e:
-                              print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Phase B Undervoltage
-               if output_phase_b_under_voltage_status == 1:
-                   if output_B_Phase_Voltage is not None and output_phase_b_under_voltage_set_value is not None:
-                      try:
-                         output_B_Phase_Voltage = float(output_B_Phase_Voltage)
-                         output_phase_b_under_voltage_set_value = float(output_phase_b_under_voltage_set_value)
-                         if output_B_Phase_Voltage <= output_phase_b_under_voltage_set_value:
-                            print("trip on - Output Phase B Undervoltage")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output Phase B Undervoltage"
-                        
-                      except ValueError as e:
-                            print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-               # Phase C Undervoltage
-               if output_phase_c_under_voltage_status == 1:
-                  if output_C_Phase_Voltage is not None and output_phase_c_under_voltage_set_value is not None:
-                     try:
-                         output_C_Phase_Voltage = float(output_C_Phase_Voltage)
-                         output_phase_c_under_voltage_set_value = float(output_phase_c_under_voltage_set_value)
-                         if output_C_Phase_Voltage <= output_phase_c_under_voltage_set_value:
-                            print("trip on - Output Phase C Undervoltage")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output Phase C Undervoltage"
-                        
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-               # Output DC Over Voltage
-               if output_dc_over_voltage_status == 1:
-                  if output_DC_Voltage is not None and output_dc_over_voltage_set_value is not None:
-                     try:
-                       output_DC_Voltage = float(output_DC_Voltage)
-                       output_dc_over_voltage_set_value = float(output_dc_over_voltage_set_value)
-                       if output_DC_Voltage >= output_dc_over_voltage_set_value:
-                         print("trip on - Output DC Over Voltage")
-                         GPIO.output(output_trip_pin, GPIO.HIGH)
-                         GPIO.output(led_output, GPIO.HIGH)
-                         output_status = "Unhealthy"
-                         breaker_status = "Trip"
-                         fault_type = "Output DC Over Voltage"
-                       
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Output DC Under Voltage
-               if output_dc_under_voltage_status == 1:
-                  if output_DC_Voltage is not None and output_dc_under_voltage_set_value is not None:
-                     try:
-                       output_DC_Voltage = float(output_DC_Voltage)
-                       output_dc_under_voltage_set_value = float(output_dc_under_voltage_set_value)
-                       if output_DC_Voltage <= output_dc_under_voltage_set_value:
-                         print("trip on - Output DC Under Voltage")
-                         GPIO.output(output_trip_pin, GPIO.HIGH)
-                         GPIO.output(led_output, GPIO.HIGH)
-                         output_status = "Unhealthy"
-                         breaker_status = "Trip"
-                         fault_type = "Output DC Under Voltage"
-                       
-                     except ValueError as e:
-                        print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-
-                # Over Frequency
-               if output_over_frequency_status == 1:
-                  if output_Frequency is not None and output_over_frequency_set_value is not None:
-                     try:
-                        output_Frequency = float(output_Frequency)
-                        output_over_frequency_set_value = float(output_over_frequency_set_value)
-                        if output_Frequency >= output_over_frequency_set_value:
-                           print("trip on - Output Over Frequency")
-                           GPIO.output(output_trip_pin, GPIO.HIGH)
-                           GPIO.output(led_output, GPIO.HIGH)
-                           output_status = "Unhealthy"
-                           breaker_status = "Trip"
-                           fault_type = "Output Over Frequency"
-                        
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                # Under Frequency
-               if output_under_frequency_status == 1:
-                  if output_Frequency is not None and output_under_frequency_set_value is not None:
-                     try:
-                         output_Frequency = float(output_Frequency)
-                         output_under_frequency_set_value = float(output_under_frequency_set_value)
-                         if output_Frequency <= output_under_frequency_set_value:
-                            print("trip on - Output Under Frequency")
-                            GPIO.output(output_trip_pin, GPIO.HIGH)
-                            GPIO.output(led_output, GPIO.HIGH)
-                            output_status = "Unhealthy"
-                            breaker_status = "Trip"
-                            fault_type = "Output Under Frequency"
-                         
-                     except ValueError as e:
-                          print(f"Conversion Error: {e} - Check if output values are valid numbers.")
-
-                 # ========================= INVERSE TIME OVERCURRENT LOGIC =========================
-
-            if Inverse_Time_Characteristics_status == 1:
-                 # Phase A Overcurrent
-              if input_phase_a_over_current_status == 1:
-                
-                 if input_A_Phase_Current is not None and input_phase_a_over_current_set_value is not None:
-                     try:
-                         input_A_Phase_Current = float(input_A_Phase_Current)
-                         input_phase_a_over_current_set_value = float(input_phase_a_over_current_set_value)
-
-                         if input_A_Phase_Current >= 20 * input_phase_a_over_current_set_value:
-                             print("Input Phase A Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(input_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_input, GPIO.HIGH)
-                             print("trip on - Input Phase A Overcurrent")
-                             input_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Input Phase A Overcurrent"
+            # ========================= PROTECTION ELEMENTS =========================
+            # Instantaneous, definite-time, inverse-time and differential elements in one pass
+            tripped_elements = element_table.evaluate(measurements, time.monotonic())
+            evaluated = time.monotonic_ns()
+            if new_samples:
+                latency.record(EVALUATION, picked_up, evaluated)
 
-                         elif input_A_Phase_Current >= 10 * input_phase_a_over_current_set_value:
-                              print("Input Phase A Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase A Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase A Overcurrent"
-
-                         elif input_A_Phase_Current >= 5 * input_phase_a_over_current_set_value:
-                              print("Input Phase A Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase A Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase A Overcurrent"
-
-                         elif input_A_Phase_Current >= 2 * input_phase_a_over_current_set_value:
-                              print("Input Phase A Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase A Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase A Overcurrent"
-
-                         elif input_A_Phase_Current >= input_phase_a_over_current_set_value:
-                              print("Input Phase A Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase A Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase A Overcurrent"
-
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                      # Phase B Overcurrent
-              if input_phase_b_over_current_status == 1:
-                 if input_B_Phase_Current is not None and input_phase_b_over_current_set_value is not None:
-                     try:
-                         input_B_Phase_Current = float(input_B_Phase_Current)
-                         input_phase_b_over_current_set_value = float(input_phase_b_over_current_set_value)
-
-                         if input_B_Phase_Current >= 20 * input_phase_b_over_current_set_value:
-                             print("Input Phase B Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(input_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_input, GPIO.HIGH)
-                             print("trip on - Input Phase B Overcurrent")
-                             input_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Input Phase B Overcurrent"
-
-                         elif input_B_Phase_Current >= 10 * input_phase_b_over_current_set_value:
-                              print("Input Phase B Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase B Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase B Overcurrent"
-
-                         elif input_B_Phase_Current >= 5 * input_phase_b_over_current_set_value:
-                              print("Input Phase B Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase B Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase B Overcurrent"
-
-                         elif input_B_Phase_Current >= 2 * input_phase_b_over_current_set_value:
-                              print("Input Phase B Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase B Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase B Overcurrent"
-
-                         elif input_B_Phase_Current >= input_phase_b_over_current_set_value:
-                              print("Input Phase B Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase B Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase B Overcurrent"
-
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                 # Phase C Overcurrent
-              if input_phase_c_over_current_status == 1:
-                 if input_C_Phase_Current is not None and input_phase_c_over_current_set_value is not None:
-                     try:
-                         input_C_Phase_Current = float(input_C_Phase_Current)
-                         input_phase_c_over_current_set_value = float(input_phase_c_over_current_set_value)
-
-                         if input_C_Phase_Current >= 20 * input_phase_c_over_current_set_value:
-                             print("Input Phase C Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(input_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_input, GPIO.HIGH)
-                             print("trip on - Input Phase C Overcurrent")
-                             input_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Input Phase C Overcurrent"
-
-                         elif input_C_Phase_Current >= 10 * input_phase_c_over_current_set_value:
-                              print("Input Phase C Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase C Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase C Overcurrent"
-
-                         elif input_C_Phase_Current >= 5 * input_phase_c_over_current_set_value:
-                              print("Input Phase C Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase C Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase C Overcurrent"
-
-                         elif input_C_Phase_Current >= 2 * input_phase_c_over_current_set_value:
-                              print("Input Phase C Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase C Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase C Overcurrent"
-
-                         elif input_C_Phase_Current >= input_phase_c_over_current_set_value:
-                              print("Input Phase C Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input Phase C Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input Phase C Overcurrent"
-            
-
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-
-               # Phase A Overcurrent
-              if output_phase_a_over_current_status == 1:
-                 if output_A_Phase_Current is not None and output_phase_a_over_current_set_value is not None:
-                     try:
-                         output_A_Phase_Current = float(output_A_Phase_Current)
-                         output_phase_a_over_current_set_value = float(output_phase_a_over_current_set_value)
-
-                         if output_A_Phase_Current >= 20 * output_phase_a_over_current_set_value:
-                             print("Outpt Phase A Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(output_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_output, GPIO.HIGH)
-                             print("trip on - Output Phase A Overcurrent")
-                             output_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Output Phase A Overcurrent"
-
-                         elif output_A_Phase_Current >= 10 * output_phase_a_over_current_set_value:
-                              print("Output Phase A Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase A Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase A Overcurrent"
-
-                         elif output_A_Phase_Current >= 5 * output_phase_a_over_current_set_value:
-                              print("Output Phase A Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase A Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase A Overcurrent"
-
-                         elif output_A_Phase_Current >= 2 * output_phase_a_over_current_set_value:
-                              print("Output Phase A Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase A Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase A Overcurrent"
-
-                         elif output_A_Phase_Current >= output_phase_a_over_current_set_value:
-                              print("Output Phase A Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase A Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase A Overcurrent"
-            
-
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-                # Phase B Overcurrent
-              if output_phase_b_over_current_status == 1:
-                 if output_B_Phase_Current is not None and output_phase_b_over_current_set_value is not None:
-                     try:
-                         output_B_Phase_Current = float(output_B_Phase_Current)
-                         output_phase_b_over_current_set_value = float(output_phase_b_over_current_set_value)
-
-                         if output_B_Phase_Current >= 20 * output_phase_b_over_current_set_value:
-                             print("Output Phase B Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(output_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_output, GPIO.HIGH)
-                             print("trip on - Output Phase B Overcurrent")
-                             output_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Output Phase B Overcurrent"
-
-                         elif output_B_Phase_Current >= 10 * output_phase_b_over_current_set_value:
-                              print("Output Phase B Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase B Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase B Overcurrent"
-
-                         elif output_B_Phase_Current >= 5 * output_phase_b_over_current_set_value:
-                              print("Output Phase B Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase B Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase B Overcurrent"
-
-                         elif output_B_Phase_Current >= 2 * output_phase_b_over_current_set_value:
-                              print("Output Phase B Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase B Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase B Overcurrent"
-
-                         elif output_B_Phase_Current >= output_phase_b_over_current_set_value:
-                              print("Output Phase B Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase B Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase B Overcurrent"
-            
-
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-
-               # Phase C Overcurrent
-              if output_phase_c_over_current_status == 1:
-                 if output_C_Phase_Current is not None and output_phase_c_over_current_set_value is not None:
-                     try:
-                         output_C_Phase_Current = float(output_C_Phase_Current)
-                         output_phase_c_over_current_set_value = float(output_phase_c_over_current_set_value)
-
-                         if output_C_Phase_Current >= 20 * output_phase_c_over_current_set_value:
-                             print("Output Phase C Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(output_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_output, GPIO.HIGH)
-                             print("trip on - Output Phase C Overcurrent")
-                             output_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Output Phase C Overcurrent"
-
-                         elif output_C_Phase_Current >= 10 * output_phase_c_over_current_set_value:
-                              print("Output Phase C Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase C Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase C Overcurrent"
-
-                         elif output_C_Phase_Current >= 5 * output_phase_c_over_current_set_value:
-                              print("Output Phase C Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase C Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase C Overcurrent"
-
-                         elif output_C_Phase_Current >= 2 * output_phase_c_over_current_set_value:
-                              print("Output Phase C Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase C Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase C Overcurrent"
-
-                         elif output_C_Phase_Current >= output_phase_c_over_current_set_value:
-                              print("Output Phase C Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output Phase C Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output Phase C Overcurrent"
-
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-        
-              # DC Input Over Current
-              if input_dc_over_current_status == 1:
-                 if input_DC_Current is not None and input_dc_over_current_set_value is not None:
-                     try:
-                         input_DC_Current = float(input_DC_Current)
-                         input_dc_over_current_set_value = float(input_dc_over_current_set_value)
-
-                         if input_DC_Current >= 20 * input_dc_over_current_set_value:
-                             print("Input DC Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(input_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_input, GPIO.HIGH)
-                             print("trip on - Input DC Overcurrent")
-                             input_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Input DC Overcurrent"
-
-                         elif input_DC_Current >= 10 * input_dc_over_current_set_value:
-                              print("Input DC Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input DC Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input DC Overcurrent"
-
-                         elif input_DC_Current >= 5 * input_dc_over_current_set_value:
-                              print("Input DC Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input DC Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input DC Overcurrent"
-
-                         elif input_DC_Current >= 2 * input_dc_over_current_set_value:
-                              print("Input DC Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input DC Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input DC Overcurrent"
-
-                         elif input_DC_Current >= input_dc_over_current_set_value:
-                              print("Input DC Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(input_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_input, GPIO.HIGH)
-                              print("trip on - Input DC Overcurrent")
-                              input_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Input DC Overcurrent"
-            
-
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-
-               # DC Output Over Current
-              if output_dc_over_current_status == 1:
-                 if output_DC_Current is not None and output_dc_over_current_set_value is not None:
-                     try:
-                         output_DC_Current = float(output_DC_Current)
-                         output_dc_over_current_set_value = float(output_dc_over_current_set_value)
-
-                         if output_DC_Current >= 20 * output_dc_over_current_set_value:
-                             print("Output DC Overcurrent (20x) detected! Waiting 0.5 sec before trip.")
-                             time.sleep(0.5)
-                             GPIO.output(output_trip_pin, GPIO.HIGH)
-                             GPIO.output(led_output, GPIO.HIGH)
-                             print("trip on - Output DC Overcurrent")
-                             output_status = "Unhealthy"
-                             breaker_status = "Trip"
-                             fault_type = "Output DC Overcurrent"
-
-                         elif output_DC_Current >= 10 * output_dc_over_current_set_value:
-                              print("Output DC Overcurrent (10x) detected! Waiting 1 sec before trip.")
-                              time.sleep(1)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output DC Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output DC Overcurrent"
-
-                         elif output_DC_Current >= 5 * output_dc_over_current_set_value:
-                              print("Output DC Overcurrent (5x) detected! Waiting 2.5 sec before trip.")
-                              time.sleep(2.5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output DC Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output DC Overcurrent"
+            for element in tripped_elements:
+                print(f"trip on - {element.name}")
+                if element.side in (INPUT, BOTH):
+                    GPIO.output(input_trip_pin, GPIO.HIGH)
+                    GPIO.output(led_input, GPIO.HIGH)
+                    input_status = "Unhealthy"
+                if element.side in (OUTPUT, BOTH):
+                    GPIO.output(output_trip_pin, GPIO.HIGH)
+                    GPIO.output(led_output, GPIO.HIGH)
+                    output_status = "Unhealthy"
+
+            tripped_at = None
+            if tripped_elements:
+                tripped_at = time.monotonic_ns()
+                latency.record(GPIO_WRITE, evaluated, tripped_at)
+                for side in new_samples:  # Trips caused by a fresh sample, not a running timer
+                    latency.record(TRIP_TOTAL, int(sample_times[side, ACQUIRED]), tripped_at)
+                relay_status = "Unhealthy"
+                breaker_status = "Trip"
+                fault_type = ", ".join(element.name for element in tripped_elements)
+                print(f"🚨 Fault Detected: {fault_type} - Relay Unhealthy, Breaker Tripped")
 
-                         elif output_DC_Current >= 2 * output_dc_over_current_set_value:
-                              print("Output DC Overcurrent (2x) detected! Waiting 5 sec before trip.")
-                              time.sleep(5)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output DC Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output DC Overcurrent"
+            update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type, tripped_at)
+            if breaker_status == "Trip" and not was_tripped:
+                request_log_flush(acquisition_pid_file)
+            was_tripped = breaker_status == "Trip"
 
-                         elif output_DC_Current >= output_dc_over_current_set_value:
-                              print("Output DC Overcurrent detected! Waiting 10 sec before trip.")
-                              time.sleep(10)
-                              GPIO.output(output_trip_pin, GPIO.HIGH)
-                              GPIO.output(led_output, GPIO.HIGH)
-                              print("trip on - Output DC Overcurrent")
-                              output_status = "Unhealthy"
-                              breaker_status = "Trip"
-                              fault_type = "Output DC Overcurrent"
-            
-                     except ValueError as e:
-                         print(f"Conversion Error: {e} - Check if input values are valid numbers.")
-            
-                      
-                     if fault_type != "None":
-                           relay_status = "Unhealthy"
-                           breaker_status = "Trip"  # ✅ Ensure breaker status updates
-                           print(f"🚨 Fault Detected: {fault_type} - Relay Unhealthy, Breaker Tripped")
-   
-                            # ✅ Debug print before calling `update_fault_log()`
-                           # print(f"✅ Calling update_fault_log() → {relay_status}, {input_status}, {output_status}, {breaker_status}, {fault_type}")
-            update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type)
-               
 
-            # --- Add Reset Button Handling (with debounce) ---
-            reset_btn_state = GPIO.input(reset_button_pin)
-            if reset_btn_state == GPIO.LOW:  # Button pressed (LOW due to pull-up)
-              start_time = time.time()
-                
-              while GPIO.input(reset_button_pin) == GPIO.LOW:  # Wait for button release
-                   time.sleep(0.05)  # Debounce delay
-                   if time.time() - start_time > 0.5:  # Check for sustained press (optional)
-                        pass  # Optional: Ignore short glitches
-                    # Reset relays and statuses
-                        GPIO.output(input_trip_pin, GPIO.HIGH)
-                        GPIO.output(output_trip_pin, GPIO.HIGH)
-                        GPIO.output(led_input, GPIO.LOW)
-                        GPIO.output(led_output, GPIO.LOW)
-                        relay_status = "Healthy and Operational"
-                        input_status = "Healthy"
-                        output_status = "Healthy"
-                        breaker_status = "Live"
-                        fault_type = "None"
-                        update_fault_log(relay_status, input_status, output_status, breaker_status, fault_type)
-                        print("Reset triggered via physical button")
- 
-                        
-            time.sleep(interval)  # Wait before the next update
+            # Wait for the next sample, waking early if a timed element is due to trip
+            waiter.wait(element_table.next_deadline(interval, time.monotonic()))
 
     except KeyboardInterrupt:
         print("\nMonitoring stopped by user.")
 
     finally:
+        buttons.stop()
+        waiter.stop()
+        fault_writer.stop()
+        latency.stop()
         GPIO.cleanup()
         print("GPIO cleaned up.")
 
 # File paths
 excel_path = "/home/rahul/Desktop/Project/User Data Input.xlsx"
 sheet_name = "Sheet1"
-excel_cells = [
-    "B2","B3","B4","B5","B6","B7","B8","B9","B10","B11","B12","B13","B14","B15","B16","B17","B18","B19","B20","B21",
-    "B22","B23","B24","B25","B26","B27","B28","B29","B30","B31","B32","B33","B34","B35","B36","B37","B38","B39","B40",
-    "B41","B42","B43","B44","B45","B46","B47","B48","B49","B50","B51","B52","B53","B54","B55","B56","B57","B58","B59",
-    "B60","B61","B62","B63","B64","B65","B66","B67"  
-]
+excel_cells = [f"B{row}" for row in range(2, 2 + len(SETTINGS_FIELDS))]  # B2..B105, one per setting
  
 input_csv = "/home/rahul/Desktop/Project/Input Real Time Data/Real-time data for relay.csv"
 output_csv = "/home/rahul/Desktop/Project/Output Real Time Data/Real-time data for relay.csv"
 fault_log_file = "/home/rahul/Desktop/Project/Relay_indication.xlsx"
 fault_csv_file = "/home/rahul/Desktop/Project/fault_log.csv"
+latency_status_file = "/home/rahul/Desktop/Project/relay_latency.json"  # p50/p99/max per pipeline stage
+acquisition_pid_file = "/home/rahul/Desktop/Project/acquisition_daemon.pid"  # Signalled to flush the power logs on a trip
 
 create_fault_log()
+latency = LatencyMonitor(latency_status_file).start()
+fault_writer = FaultLogWriter(fault_log_file, fault_csv_file, latency=latency).start()
 
 # Start monitoring
-monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv)
\ No newline at end of file
+monitor_files(excel_path, sheet_name, excel_cells, input_csv, output_csv,
+              input_ring=INPUT_RING_PATH, output_ring=OUTPUT_RING_PATH)
\ No newline at end of file
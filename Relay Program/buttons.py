@@ -0,0 +1,106 @@
+import collections
+import threading
+
+TRIP_HELD = "trip"
+RESET_PRESSED = "reset"
+
+class ButtonMonitor:
+    """Turns trip/reset button edges into actions for the relay loop.
+
+    Edge callbacks from GPIO.add_event_detect only arm a short settle timer;
+    the pin is read once it expires, so contact bounce never reaches the
+    loop. The trip button's hold time is measured with another timer, so
+    neither depends on how often the protection loop runs.
+
+    Actions queue up until the loop collects them with poll(); on_action
+    (e.g. the loop's waiter.wake) is called for each one so a press is handled
+    without waiting for the next sample. Buttons are active LOW.
+    """
+
+    def __init__(self, gpio, trip_pin, reset_pin, hold_time=3.0, debounce=0.05, on_action=None):
+        self.gpio = gpio
+        self.trip_pin = trip_pin
+        self.reset_pin = reset_pin
+        self.hold_time = hold_time
+        self.debounce = debounce
+        self.on_action = on_action
+        self.actions = collections.deque()
+        self.lock = threading.Lock()
+        self.pressed = {trip_pin: False, reset_pin: False}
+        self.settle_timers = {trip_pin: None, reset_pin: None}
+        self.hold_timer = None
+        self.presses = 0  # Identifies the trip press a hold timer belongs to
+
+    def start(self):
+        bouncetime = int(self.debounce * 1000)
+        for pin in (self.trip_pin, self.reset_pin):
+            self.gpio.add_event_detect(pin, self.gpio.BOTH, callback=self._edge, bouncetime=bouncetime)
+        return self
+
+    def stop(self):
+        for pin in (self.trip_pin, self.reset_pin):
+            try:
+                self.gpio.remove_event_detect(pin)
+            except Exception as e:
+                print(f"Button Cleanup Error: {e}")
+        with self.lock:
+            self._cancel_hold()
+            for timer in self.settle_timers.values():
+                if timer is not None:
+                    timer.cancel()
+
+    def poll(self):
+        """Returns the actions raised since the last call, oldest first."""
+        with self.lock:
+            actions = list(self.actions)
+            self.actions.clear()
+        return actions
+
+    def _post(self, action):
+        with self.lock:
+            self.actions.append(action)
+        if self.on_action is not None:
+            self.on_action()
+
+    def _cancel_hold(self):
+        if self.hold_timer is not None:
+            self.hold_timer.cancel()
+            self.hold_timer = None
+
+    def _edge(self, pin):
+        # Runs on the GPIO event thread; the level is read once the contacts settle
+        with self.lock:
+            timer = self.settle_timers[pin]
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.debounce, self._settled, args=(pin,))
+            timer.daemon = True
+            self.settle_timers[pin] = timer
+            timer.start()
+
+    def _settled(self, pin):
+        pressed = self.gpio.input(pin) == self.gpio.LOW
+        with self.lock:
+            self.settle_timers[pin] = None
+            if pressed == self.pressed[pin]:
+                return  # Bounce that came back to the same level
+            self.pressed[pin] = pressed
+            if pin == self.trip_pin:
+                self._cancel_hold()
+                if pressed:
+                    self.presses += 1
+                    self.hold_timer = threading.Timer(self.hold_time, self._held, args=(self.presses,))
+                    self.hold_timer.daemon = True
+                    self.hold_timer.start()
+                return
+        if pressed:
+            self._post(RESET_PRESSED)
+
+    def _held(self, press):
+        with self.lock:
+            if press != self.presses or self.hold_timer is None or not self.pressed[self.trip_pin]:
+                return
+            self.hold_timer = None
+            still_pressed = self.gpio.input(self.trip_pin) == self.gpio.LOW
+        if still_pressed:
+            self._post(TRIP_HELD)
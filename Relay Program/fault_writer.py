@@ -0,0 +1,122 @@
+import csv
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import openpyxl
+
+from latency import FAULT_LOG_WRITE
+
+FAULT_LOG_HEADERS = ["Timestamp", "Relay Status", "Input Status", "Output Status", "Circuit Breaker Status", "Fault Type"]
+
+_STOP = object()
+
+class FaultLogWriter:
+    """Writes relay indication and fault log output on a background thread.
+
+    The protection loop only puts status tuples on a queue. The writer thread
+    rewrites the indication workbook when the status actually changes, at most
+    once every min_interval seconds (the latest status always ends up on disk),
+    so the workbook is the per-tick view. The CSV log only gets a row when the
+    relay status, breaker status or fault type changes, appended through one
+    buffered file handle that is flushed whenever the queue runs empty.
+
+    If a LatencyMonitor is given, faults submitted with tripped_at (the
+    monotonic_ns stamp of the trip outputs) record how long they took to reach
+    the CSV log.
+    """
+
+    def __init__(self, excel_path, csv_path, min_interval=0.5, latency=None):
+        self.excel_path = excel_path
+        self.csv_path = csv_path
+        self.min_interval = min_interval
+        self.latency = latency
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="fault-log-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Writes anything still queued and waits for the thread to finish."""
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def submit(self, relay_status, input_status, output_status, breaker_status, fault_type, tripped_at=None):
+        self.queue.put((time.time(), (relay_status, input_status, output_status, breaker_status, fault_type), tripped_at))
+
+    def _write_indication(self, timestamp, status):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "Fault Log"
+        sheet.append(FAULT_LOG_HEADERS)
+        sheet.append([timestamp, *status])
+        # Save next to the target and swap it in so readers never see a partial file
+        temp_path = f"{self.excel_path}.tmp"
+        workbook.save(temp_path)
+        workbook.close()
+        os.replace(temp_path, self.excel_path)
+
+    def _run(self):
+        csv_file = open(self.csv_path, mode='a', newline='')
+        csv_writer = csv.writer(csv_file)
+        written_status = None
+        logged_change = None  # (relay status, breaker status, fault type) of the last CSV row
+        pending = None
+        last_write = 0.0
+        unflushed_trips = []  # tripped_at stamps of fault rows not yet flushed
+
+        try:
+            while True:
+                timeout = None
+                if pending is not None:
+                    timeout = max(0.0, last_write + self.min_interval - time.monotonic())
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+
+                if item is not None:
+                    submitted, status, tripped_at = item
+                    timestamp = datetime.fromtimestamp(submitted).strftime("%Y-%m-%d %H:%M:%S")
+                    change = (status[0], status[3], status[4])
+                    if change != logged_change:
+                        logged_change = change
+                        try:
+                            csv_writer.writerow([timestamp, *status])
+                            if tripped_at is not None:
+                                unflushed_trips.append(tripped_at)
+                            print(f"✅ Logged status change: {status[0]}, breaker {status[3]}, fault {status[4]} at {timestamp}")
+                        except Exception as e:
+                            print(f"CSV Append Error: {e}")
+                    pending = (timestamp, status) if status != written_status else None
+                    if not self.queue.empty():
+                        continue  # Drain the backlog before touching the disk
+                    csv_file.flush()
+                    if unflushed_trips and self.latency is not None:
+                        flushed = time.monotonic_ns()
+                        for tripped_at in unflushed_trips:
+                            self.latency.record(FAULT_LOG_WRITE, tripped_at, flushed)
+                    unflushed_trips.clear()
+
+                if pending is not None and time.monotonic() - last_write >= self.min_interval:
+                    try:
+                        self._write_indication(*pending)
+                        written_status = pending[1]
+                        pending = None
+                    except Exception as e:
+                        print(f"Excel Update Error: {e}")  # Retried after min_interval
+                    last_write = time.monotonic()
+
+            if pending is not None:
+                self._write_indication(*pending)
+        except Exception as e:
+            print(f"Excel Update Error: {e}")
+        finally:
+            csv_file.close()
@@ -0,0 +1,77 @@
+import time
+
+# Inverse-time overcurrent curve as (multiple of set value, seconds to trip).
+# Same steps the relay used to wait out with time.sleep(), highest multiple first.
+INVERSE_TIME_CURVE = (
+    (20, 0.5),
+    (10, 1),
+    (5, 2.5),
+    (2, 5),
+    (1, 10),
+)
+
+def inverse_time_delay(measured, set_value, curve=INVERSE_TIME_CURVE):
+    """Returns the trip delay for a measured value, or None if it is below pickup."""
+    for multiple, delay in curve:
+        if measured >= multiple * set_value:
+            return delay
+    return None
+
+class InverseTimeTimer:
+    """Pickup timer for one inverse-time element.
+
+    Instead of sleeping for the whole trip delay, every loop tick calls update()
+    with the latest sample. The timer adds the elapsed time as a fraction of the
+    delay for the current fault level and trips once that reaches 1, so a fault
+    that grows while timing trips sooner, and several elements can time at once.
+    """
+
+    def __init__(self, name, curve=INVERSE_TIME_CURVE):
+        self.name = name
+        self.curve = curve
+        self.reset()
+
+    def reset(self):
+        self.progress = 0.0
+        self.delay = None
+        self.last_time = None
+        self.tripped = False
+
+    @property
+    def running(self):
+        return self.last_time is not None and not self.tripped
+
+    def update(self, measured, set_value, now=None):
+        """Feeds one sample into the timer. Returns True while the element is tripped."""
+        if now is None:
+            now = time.monotonic()
+
+        delay = inverse_time_delay(measured, set_value, self.curve)
+        if delay is None:
+            self.reset()
+            return False
+
+        if self.last_time is None:
+            print(f"{self.name} detected! Trip in {delay} sec unless it clears.")
+        else:
+            # The time since the last sample was spent at the fault level seen then
+            self.progress += (now - self.last_time) / self.delay
+        self.delay = delay
+        self.last_time = now
+
+        if self.progress >= 1 - 1e-9:
+            self.tripped = True
+        return self.tripped
+
+    def time_remaining(self):
+        """Seconds left before this element trips at the current fault level."""
+        if not self.running:
+            return None
+        return max(0.0, (1 - self.progress) * self.delay)
+
+def next_timer_deadline(timers, interval):
+    """Returns how long the relay loop may sleep without overshooting a running timer."""
+    remaining = [t.time_remaining() for t in timers if t.running]
+    if not remaining:
+        return interval
+    return min(interval, min(remaining))
@@ -0,0 +1,125 @@
+import bisect
+import json
+import math
+import os
+import threading
+from datetime import datetime
+
+# Pipeline stages, in order. The first two are timed by the logger and carried
+# in the ring record; the rest are timed by the relay and the fault log writer.
+SERIAL_READ = "serial_read"          # Line read from the port -> parsed
+PUBLISH = "publish"                  # Parsed -> visible in the shared-memory ring
+RELAY_PICKUP = "relay_pickup"        # Published -> read by the relay loop
+EVALUATION = "evaluation"            # Read -> protection elements evaluated
+GPIO_WRITE = "gpio_write"            # Evaluated -> trip outputs driven
+FAULT_LOG_WRITE = "fault_log_write"  # Trip outputs driven -> fault row flushed to the CSV log
+TRIP_TOTAL = "trip_total"            # Line read from the port -> trip outputs driven
+
+STAGES = (SERIAL_READ, PUBLISH, RELAY_PICKUP, EVALUATION, GPIO_WRITE, FAULT_LOG_WRITE, TRIP_TOTAL)
+
+# Bucket upper bounds from 1 us to 100 s, 20 per decade (about 12% wide)
+BUCKET_BOUNDS_NS = [round(1000 * 10 ** (i / 20)) for i in range(161)]
+
+class LatencyHistogram:
+    """Log-bucketed latency counts with an exact maximum."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_NS, ns)] += 1
+        self.count += 1
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile, in ns (None if empty)."""
+        if self.count == 0:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS_NS + [self.max_ns], self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        def ms(ns):
+            return None if ns is None else round(ns / 1e6, 3)
+        return {
+            "count": self.count,
+            "p50_ms": ms(self.percentile(50)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max_ns if self.count else None),
+        }
+
+class LatencyMonitor:
+    """Per-stage latency histograms for the sample-to-trip pipeline.
+
+    Stamps are time.monotonic_ns() values, which are comparable between the
+    logger and relay processes. record() is called from the relay loop and the
+    fault log writer; a background thread rewrites status_path with the
+    p50/p99/max of every stage every `period` seconds.
+    """
+
+    def __init__(self, status_path, period=5.0):
+        self.status_path = status_path
+        self.period = period
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="latency-status", daemon=True)
+        self.seen = {}  # Last ring sequence number recorded per side
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.write_status()
+
+    def record(self, stage, start_ns, end_ns):
+        if start_ns <= 0 or end_ns < start_ns:
+            return  # No stamp (CSV fallback or an older logger)
+        with self.lock:
+            self.histograms[stage].record(end_ns - start_ns)
+
+    def record_sample(self, side, seq, times, picked_up):
+        """Records the logger's stages and the relay pickup, once per new ring record.
+
+        Returns True if this record had not been seen before.
+        """
+        if seq is None or self.seen.get(side) == seq:
+            return False
+        self.seen[side] = seq
+        acquired, parsed, published = (int(t) for t in times)
+        self.record(SERIAL_READ, acquired, parsed)
+        self.record(PUBLISH, parsed, published)
+        self.record(RELAY_PICKUP, published, picked_up)
+        return True
+
+    def summary(self):
+        with self.lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def write_status(self):
+        status = {
+            "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "stages": self.summary(),
+        }
+        temp_path = f"{self.status_path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(status, f, indent=2)
+            os.replace(temp_path, self.status_path)
+        except OSError as e:
+            print(f"Latency Status Error: {e}")
+
+    def _run(self):
+        while not self.stopped.wait(self.period):
+            self.write_status()
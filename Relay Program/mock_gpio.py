@@ -0,0 +1,75 @@
+import threading
+
+class MockGPIO:
+    """Stand-in for the parts of Jetson.GPIO the relay uses, for running off the Jetson.
+
+    Outputs are recorded in levels; inputs idle HIGH like the pulled-up
+    buttons. press()/release() drive an input and fire any callback registered
+    with add_event_detect from the calling thread, as the real library does
+    from its own event thread.
+    """
+    BOARD = "BOARD"
+    BCM = "BCM"
+    IN = "IN"
+    OUT = "OUT"
+    LOW = 0
+    HIGH = 1
+    RISING = "RISING"
+    FALLING = "FALLING"
+    BOTH = "BOTH"
+
+    def __init__(self):
+        self.mode = None
+        self.directions = {}
+        self.levels = {}
+        self.callbacks = {}
+        self.lock = threading.Lock()
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, channel, direction, pull_up_down=None, initial=None):
+        self.directions[channel] = direction
+        if initial is None:
+            initial = self.HIGH if direction == self.IN else self.LOW
+        self.levels[channel] = initial
+
+    def input(self, channel):
+        return self.levels[channel]
+
+    def output(self, channel, value):
+        if self.directions.get(channel) != self.OUT:
+            raise RuntimeError(f"Channel {channel} is not set up as an output")
+        self.levels[channel] = value
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        if self.directions.get(channel) != self.IN:
+            raise RuntimeError(f"Channel {channel} is not set up as an input")
+        self.callbacks[channel] = (edge, callback)
+
+    def remove_event_detect(self, channel):
+        self.callbacks.pop(channel, None)
+
+    def cleanup(self):
+        self.directions.clear()
+        self.levels.clear()
+        self.callbacks.clear()
+
+    def set_input(self, channel, value):
+        """Drives an input pin and fires its edge callback if the edge matches."""
+        with self.lock:
+            previous = self.levels.get(channel)
+            self.levels[channel] = value
+            edge, callback = self.callbacks.get(channel, (None, None))
+        if callback is None or previous == value:
+            return
+        if edge == self.BOTH or edge == (self.RISING if value == self.HIGH else self.FALLING):
+            callback(channel)
+
+    def press(self, channel):
+        self.set_input(channel, self.LOW)
+
+    def release(self, channel):
+        self.set_input(channel, self.HIGH)
+
+GPIO = MockGPIO()
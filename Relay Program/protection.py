@@ -0,0 +1,270 @@
+from collections import namedtuple
+
+import numpy as np
+
+import sample_schema as schema
+from inverse_time import InverseTimeTimer, next_timer_deadline
+
+# Measurement vector layout: row 0 is the input meter, row 1 the output meter,
+# columns are the 22 meter values of a Sample (schema column - VALUE_OFFSET).
+INPUT, OUTPUT = 0, 1
+BOTH = 2  # Side of elements that trip both breakers
+CHANNEL_COUNT = schema.VALUE_COUNT
+
+A_VOLTAGE = schema.A_PHASE_VOLTAGE - schema.VALUE_OFFSET
+A_CURRENT = schema.A_PHASE_CURRENT - schema.VALUE_OFFSET
+B_VOLTAGE = schema.B_PHASE_VOLTAGE - schema.VALUE_OFFSET
+B_CURRENT = schema.B_PHASE_CURRENT - schema.VALUE_OFFSET
+C_VOLTAGE = schema.C_PHASE_VOLTAGE - schema.VALUE_OFFSET
+C_CURRENT = schema.C_PHASE_CURRENT - schema.VALUE_OFFSET
+FREQUENCY = schema.FREQUENCY - schema.VALUE_OFFSET
+DC_VOLTAGE = schema.DC_VOLTAGE - schema.VALUE_OFFSET
+DC_CURRENT = schema.DC_CURRENT - schema.VALUE_OFFSET
+TEMPERATURE = schema.TEMPERATURE - schema.VALUE_OFFSET
+
+OVER, UNDER = 1, -1
+
+# Characteristics. Enabling definite-time moves every element onto its own
+# delay, except overcurrent elements when inverse-time is also enabled.
+INSTANTANEOUS = "instantaneous"  # Instantaneous or definite-time
+OVERCURRENT = "overcurrent"      # Instantaneous, definite-time or inverse-time
+DIFFERENTIAL = "differential"    # Percentage-bias input/output current comparison
+
+# setting is the RelaySettings prefix for the <setting>_status / <setting>_set_value pair,
+# delay the default definite-time delay in seconds (<setting>_delay overrides it)
+ProtectionElement = namedtuple("ProtectionElement", "name side channel direction setting characteristic delay")
+
+ELEMENTS = (
+    ProtectionElement("Input Phase A Overcurrent", INPUT, A_CURRENT, OVER, "input_phase_a_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Input Phase B Overcurrent", INPUT, B_CURRENT, OVER, "input_phase_b_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Input Phase C Overcurrent", INPUT, C_CURRENT, OVER, "input_phase_c_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Input DC Overcurrent", INPUT, DC_CURRENT, OVER, "input_dc_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Input Over Temperature", INPUT, TEMPERATURE, OVER, "input_over_temperature", INSTANTANEOUS, 5),
+    ProtectionElement("Input Phase A Overvoltage", INPUT, A_VOLTAGE, OVER, "input_phase_a_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input Phase B Overvoltage", INPUT, B_VOLTAGE, OVER, "input_phase_b_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input Phase C Overvoltage", INPUT, C_VOLTAGE, OVER, "input_phase_c_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input Phase A Undervoltage", INPUT, A_VOLTAGE, UNDER, "input_phase_a_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input Phase B Undervoltage", INPUT, B_VOLTAGE, UNDER, "input_phase_b_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input Phase C Undervoltage", INPUT, C_VOLTAGE, UNDER, "input_phase_c_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input DC Over Voltage", INPUT, DC_VOLTAGE, OVER, "input_dc_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input DC Under Voltage", INPUT, DC_VOLTAGE, UNDER, "input_dc_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Input Over Frequency", INPUT, FREQUENCY, OVER, "input_over_frequency", INSTANTANEOUS, 1),
+    ProtectionElement("Input Under Frequency", INPUT, FREQUENCY, UNDER, "input_under_frequency", INSTANTANEOUS, 1),
+    ProtectionElement("Output Phase A Overcurrent", OUTPUT, A_CURRENT, OVER, "output_phase_a_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Output Phase B Overcurrent", OUTPUT, B_CURRENT, OVER, "output_phase_b_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Output Phase C Overcurrent", OUTPUT, C_CURRENT, OVER, "output_phase_c_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Output DC Overcurrent", OUTPUT, DC_CURRENT, OVER, "output_dc_over_current", OVERCURRENT, 0.5),
+    ProtectionElement("Output Over Temperature", OUTPUT, TEMPERATURE, OVER, "output_over_temperature", INSTANTANEOUS, 5),
+    ProtectionElement("Output Phase A Overvoltage", OUTPUT, A_VOLTAGE, OVER, "output_phase_a_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output Phase B Overvoltage", OUTPUT, B_VOLTAGE, OVER, "output_phase_b_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output Phase C Overvoltage", OUTPUT, C_VOLTAGE, OVER, "output_phase_c_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output Phase A Undervoltage", OUTPUT, A_VOLTAGE, UNDER, "output_phase_a_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output Phase B Undervoltage", OUTPUT, B_VOLTAGE, UNDER, "output_phase_b_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output Phase C Undervoltage", OUTPUT, C_VOLTAGE, UNDER, "output_phase_c_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output DC Over Voltage", OUTPUT, DC_VOLTAGE, OVER, "output_dc_over_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output DC Under Voltage", OUTPUT, DC_VOLTAGE, UNDER, "output_dc_under_voltage", INSTANTANEOUS, 2),
+    ProtectionElement("Output Over Frequency", OUTPUT, FREQUENCY, OVER, "output_over_frequency", INSTANTANEOUS, 1),
+    ProtectionElement("Output Under Frequency", OUTPUT, FREQUENCY, UNDER, "output_under_frequency", INSTANTANEOUS, 1),
+)
+
+# Percentage-bias characteristic: trip when |Iin - Iout*ratio| exceeds the larger of
+# the minimum pickup and the slope times the mean of the two currents, continuously for
+# the security delay (the two meters are sampled independently, so a single pair of
+# readings taken across a load step must not trip). Defaults for the differential_* settings.
+DIFFERENTIAL_PICKUP = 0.5           # A
+DIFFERENTIAL_SLOPE = 0.3            # 30 % bias
+DIFFERENTIAL_RATIO = 1.0            # Output current scaling onto the input side
+DIFFERENTIAL_SECURITY_DELAY = 0.1   # s
+
+# Differential elements compare the same current channel on both meters. Each is
+# enabled by its own <setting>_status, as it only makes sense where both meters
+# measure the same kind of current (not across a DC/AC converter).
+DIFFERENTIAL_ELEMENTS = (
+    ProtectionElement("Phase A Differential", BOTH, A_CURRENT, OVER, "phase_a_differential", DIFFERENTIAL,
+                      DIFFERENTIAL_SECURITY_DELAY),
+    ProtectionElement("Phase B Differential", BOTH, B_CURRENT, OVER, "phase_b_differential", DIFFERENTIAL,
+                      DIFFERENTIAL_SECURITY_DELAY),
+    ProtectionElement("Phase C Differential", BOTH, C_CURRENT, OVER, "phase_c_differential", DIFFERENTIAL,
+                      DIFFERENTIAL_SECURITY_DELAY),
+    ProtectionElement("DC Differential", BOTH, DC_CURRENT, OVER, "dc_differential", DIFFERENTIAL,
+                      DIFFERENTIAL_SECURITY_DELAY),
+)
+
+class ProtectionState:
+    """Element timing that has to survive settings reloads."""
+
+    def __init__(self, elements=ELEMENTS, differential_elements=DIFFERENTIAL_ELEMENTS):
+        self.inverse_time_timers = {
+            e.name: InverseTimeTimer(e.name) for e in elements if e.characteristic == OVERCURRENT}
+        self.definite_time_started = np.full(len(elements), np.nan)
+        self.differential_started = np.full(len(differential_elements), np.nan)
+
+    def reset(self):
+        for timer in self.inverse_time_timers.values():
+            timer.reset()
+        self.definite_time_started[:] = np.nan
+        self.differential_started[:] = np.nan
+
+def setting_number(settings, field, default):
+    """Numeric setting, or default if the cell is empty or not a non-negative number."""
+    value = getattr(settings, field)
+    if value is None:
+        return default
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        value = -1.0
+    if not value >= 0:
+        print(f"Conversion Error: {field} = {getattr(settings, field)!r}, using {default}.")
+        return default
+    return value
+
+def read_measurements(ring_readers, records, csv_readers, times=None, sequences=None):
+    """Builds the 2x22 measurement array, one meter at a time.
+
+    A side is copied straight out of its logger's shared-memory ring when that
+    has a record; otherwise the latest Sample of its real-time CSV is used.
+    records is a reusable (2, 23) float64 buffer for the ring copies.
+
+    If given, times (a (2, 3) int64 array) receives each ring record's logger
+    stamps and sequences (a 2-item list) its ring sequence number, or None for
+    a side read from CSV.
+    """
+    measurements = np.full((2, CHANNEL_COUNT), np.nan)
+    for side in (INPUT, OUTPUT):
+        seq = None
+        if ring_readers:
+            seq = ring_readers[side].read_latest(records[side], None if times is None else times[side])
+        if sequences is not None:
+            sequences[side] = seq
+        if seq is not None:
+            measurements[side] = records[side, schema.VALUE_OFFSET:]
+        else:
+            sample = csv_readers[side]()
+            if sample is not None:
+                measurements[side] = sample.values
+    return measurements
+
+class ElementTable:
+    """Protection elements compiled from one RelaySettings snapshot.
+
+    Compiling turns the element table into flat arrays (channel index, signed
+    threshold, characteristic masks, delays), so evaluate() checks every element
+    with a single NumPy comparison over the measurement vector. Definite-time
+    and differential elements are evaluated with array operations as well; only
+    inverse-time elements that have picked up are stepped individually.
+    Delays and the differential characteristic come from the settings, with
+    the module defaults for any left empty.
+    """
+
+    def __init__(self, settings, state, elements=ELEMENTS, differential_elements=DIFFERENTIAL_ELEMENTS):
+        self.elements = elements
+        self.differential_elements = differential_elements
+        self.state = state
+
+        instantaneous_on = settings.Instantaneous_Trip_Characteristics_status == 1
+        inverse_time_on = settings.Inverse_Time_Characteristics_status == 1
+        definite_time_on = settings.Definite_Time_Characteristics_status == 1
+        differential_on = settings.Differential_Relay_Characteristics_status == 1
+
+        count = len(elements)
+        self.channels = np.array([e.side * CHANNEL_COUNT + e.channel for e in elements], dtype=np.intp)
+        self.signs = np.array([e.direction for e in elements], dtype=np.float64)
+        self.delays = np.array([setting_number(settings, f"{e.setting}_delay", e.delay) for e in elements])
+        self.thresholds = np.zeros(count)
+        self.instantaneous = np.zeros(count, dtype=bool)
+        self.definite_time = np.zeros(count, dtype=bool)
+        self.inverse_time = np.zeros(count, dtype=bool)
+
+        for i, element in enumerate(elements):
+            if getattr(settings, f"{element.setting}_status") != 1:
+                continue
+            set_value = getattr(settings, f"{element.setting}_set_value")
+            if set_value is None:
+                continue
+            try:
+                self.thresholds[i] = float(set_value)
+            except (TypeError, ValueError) as e:
+                print(f"Conversion Error: {e} - Check the set value for {element.name}.")
+                continue
+
+            if element.characteristic == OVERCURRENT and inverse_time_on:
+                self.inverse_time[i] = True
+            elif definite_time_on:
+                self.definite_time[i] = True
+            elif instantaneous_on:
+                self.instantaneous[i] = True
+
+        self.signed_thresholds = self.signs * self.thresholds
+        self.enabled = self.instantaneous | self.definite_time | self.inverse_time
+        self.inverse_time_indices = np.flatnonzero(self.inverse_time).tolist()
+        self.differential_channels = np.array([e.channel for e in differential_elements], dtype=np.intp)
+        self.differential = np.array([differential_on and getattr(settings, f"{e.setting}_status") == 1
+                                      for e in differential_elements], dtype=bool)
+        self.differential_pickup_current = setting_number(settings, "differential_pickup", DIFFERENTIAL_PICKUP)
+        self.differential_slope = setting_number(settings, "differential_slope", DIFFERENTIAL_SLOPE)
+        self.differential_ratio = setting_number(settings, "differential_ratio", DIFFERENTIAL_RATIO)
+        security_delay = setting_number(settings, "differential_security_delay", DIFFERENTIAL_SECURITY_DELAY)
+        self.differential_delays = np.full(len(differential_elements), security_delay)
+
+        # Timers of elements that changed characteristic start from zero
+        self.state.definite_time_started[~self.definite_time] = np.nan
+        self.state.differential_started[~self.differential] = np.nan
+        for i, element in enumerate(elements):
+            if element.name in self.state.inverse_time_timers and not self.inverse_time[i]:
+                self.state.inverse_time_timers[element.name].reset()
+
+    def pickup(self, measurements):
+        """Boolean mask of enabled elements whose measurement is past the threshold."""
+        values = measurements.ravel()[self.channels]
+        return self.enabled & (self.signs * values >= self.signed_thresholds), values
+
+    def differential_pickup(self, measurements):
+        """Boolean mask of enabled differential elements outside the percentage-bias characteristic."""
+        input_current = np.abs(measurements[INPUT, self.differential_channels])
+        output_current = np.abs(measurements[OUTPUT, self.differential_channels]) * self.differential_ratio
+        operate = np.abs(input_current - output_current)
+        restraint = (input_current + output_current) / 2
+        # NaN (a meter without a reading) compares False, so a missing side never trips
+        return self.differential & (operate >= np.maximum(self.differential_pickup_current,
+                                                          self.differential_slope * restraint))
+
+    def evaluate(self, measurements, now):
+        """Returns every element that trips on this sample."""
+        picked_up, values = self.pickup(measurements)
+
+        # Definite time: remember when each element picked up, trip once its delay has passed
+        started = self.state.definite_time_started
+        timing = picked_up & self.definite_time
+        started[~timing] = np.nan
+        started[timing & np.isnan(started)] = now
+        tripping = (picked_up & self.instantaneous) | (timing & (now - started >= self.delays))
+
+        tripped = [self.elements[i] for i in np.flatnonzero(tripping)]
+
+        for i in self.inverse_time_indices:
+            element = self.elements[i]
+            timer = self.state.inverse_time_timers[element.name]
+            if not picked_up[i]:
+                timer.reset()
+            elif timer.update(values[i], self.thresholds[i], now):
+                tripped.append(element)
+
+        # Differential: the same timing as definite time, over the security delay
+        started = self.state.differential_started
+        timing = self.differential_pickup(measurements)
+        started[~timing] = np.nan
+        started[timing & np.isnan(started)] = now
+        tripped.extend(self.differential_elements[i]
+                       for i in np.flatnonzero(timing & (now - started >= self.differential_delays)))
+        return tripped
+
+    def next_deadline(self, interval, now):
+        """How long the relay loop may wait without overshooting a running timer."""
+        for delays, started in ((self.delays, self.state.definite_time_started),
+                                (self.differential_delays, self.state.differential_started)):
+            remaining = delays - (now - started)  # NaN where no element is timing
+            running = remaining > 0  # Expired timers have tripped already and stay picked up until reset
+            if running.any():
+                interval = min(interval, remaining[running].min())
+        return next_timer_deadline(self.state.inverse_time_timers.values(), interval)
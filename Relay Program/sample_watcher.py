@@ -0,0 +1,118 @@
+import os
+import threading
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Relay falls back to polling without watchdog
+    Observer = None
+    FileSystemEventHandler = object
+
+from sample_schema import COLUMN_COUNT
+
+def read_sample_timestamp(file_path):
+    """Returns the Computer_TS of the last complete row in a real-time file, or None."""
+    try:
+        with open(file_path, 'r', newline='') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    if len(lines) < 2:
+        return None
+    row = lines[-1].split(',')
+    if len(row) != COLUMN_COUNT:
+        return None  # Writer is still part way through the row
+    return row[0]
+
+class PollingWaiter:
+    """Fixed-interval wake-up, same behaviour as the original relay loop."""
+    event_driven = False
+
+    def __init__(self):
+        self.woken = threading.Event()
+
+    def start(self):
+        return self
+
+    def wait(self, timeout):
+        self.woken.wait(timeout)
+        self.woken.clear()
+        return False
+
+    def wake(self):
+        """Ends the current wait early (e.g. on a button press)."""
+        self.woken.set()
+
+    def stop(self):
+        pass
+
+class SampleWatcher(FileSystemEventHandler):
+    """Wakes the relay loop when a new sample lands in any watched real-time file.
+
+    The loggers truncate and rewrite the file, so one sample raises several
+    filesystem events. Each event only signals the loop if the file now holds a
+    complete row with a Computer_TS that has not been seen yet, so every sample
+    wakes the loop exactly once.
+    """
+    event_driven = True
+
+    def __init__(self, file_paths):
+        self.file_paths = {os.path.abspath(p) for p in file_paths}
+        self.last_timestamps = {p: read_sample_timestamp(p) for p in self.file_paths}
+        self.new_sample = threading.Event()
+        self.observer = None
+
+    def start(self):
+        self.observer = Observer()
+        for directory in {os.path.dirname(p) for p in self.file_paths}:
+            self.observer.schedule(self, directory, recursive=False)
+        self.observer.start()
+        return self
+
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+
+    def _check(self, path):
+        path = os.path.abspath(path)
+        if path not in self.file_paths:
+            return
+        timestamp = read_sample_timestamp(path)
+        if timestamp is not None and timestamp != self.last_timestamps.get(path):
+            self.last_timestamps[path] = timestamp
+            self.new_sample.set()
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._check(event.src_path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._check(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._check(event.dest_path)
+
+    def wait(self, timeout):
+        """Blocks until a new sample arrives or timeout elapses. Returns True on new data."""
+        woke = self.new_sample.wait(timeout)
+        self.new_sample.clear()
+        return woke
+
+    def wake(self):
+        """Ends the current wait early (e.g. on a button press)."""
+        self.new_sample.set()
+
+def create_waiter(file_paths, mode="event"):
+    """Returns an event-driven watcher, or the polling waiter if that is unavailable."""
+    if mode == "event":
+        if Observer is None:
+            print("watchdog not installed - falling back to polling")
+        else:
+            try:
+                return SampleWatcher(file_paths).start()
+            except Exception as e:
+                print(f"File watcher error: {e} - falling back to polling")
+    return PollingWaiter()
@@ -0,0 +1,121 @@
+import os
+from collections import namedtuple
+
+import openpyxl
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+
+# One field per cell in User Data Input.xlsx (B2..B67), in sheet order
+BASE_SETTINGS_FIELDS = (
+    "input_phase_a_over_current_status", "input_phase_a_over_current_set_value",
+    "input_phase_b_over_current_status", "input_phase_b_over_current_set_value",
+    "input_phase_c_over_current_status", "input_phase_c_over_current_set_value",
+    "input_phase_a_over_voltage_status", "input_phase_a_over_voltage_set_value",
+    "input_phase_b_over_voltage_status", "input_phase_b_over_voltage_set_value",
+    "input_phase_c_over_voltage_status", "input_phase_c_over_voltage_set_value",
+    "input_phase_a_under_voltage_status", "input_phase_a_under_voltage_set_value",
+    "input_phase_b_under_voltage_status", "input_phase_b_under_voltage_set_value",
+    "input_phase_c_under_voltage_status", "input_phase_c_under_voltage_set_value",
+    "input_over_frequency_status", "input_over_frequency_set_value",
+    "input_under_frequency_status", "input_under_frequency_set_value",
+    "input_dc_over_voltage_status", "input_dc_over_voltage_set_value",
+    "input_dc_under_voltage_status", "input_dc_under_voltage_set_value",
+    "input_dc_over_current_status", "input_dc_over_current_set_value",
+    "input_over_temperature_status", "input_over_temperature_set_value",
+    "output_phase_a_over_current_status", "output_phase_a_over_current_set_value",
+    "output_phase_b_over_current_status", "output_phase_b_over_current_set_value",
+    "output_phase_c_over_current_status", "output_phase_c_over_current_set_value",
+    "output_phase_a_over_voltage_status", "output_phase_a_over_voltage_set_value",
+    "output_phase_b_over_voltage_status", "output_phase_b_over_voltage_set_value",
+    "output_phase_c_over_voltage_status", "output_phase_c_over_voltage_set_value",
+    "output_phase_a_under_voltage_status", "output_phase_a_under_voltage_set_value",
+    "output_phase_b_under_voltage_status", "output_phase_b_under_voltage_set_value",
+    "output_phase_c_under_voltage_status", "output_phase_c_under_voltage_set_value",
+    "output_over_frequency_status", "output_over_frequency_set_value",
+    "output_under_frequency_status", "output_under_frequency_set_value",
+    "output_dc_over_voltage_status", "output_dc_over_voltage_set_value",
+    "output_dc_under_voltage_status", "output_dc_under_voltage_set_value",
+    "output_dc_over_current_status", "output_dc_over_current_set_value",
+    "output_over_temperature_status", "output_over_temperature_set_value",
+    "Instantaneous_Trip_Characteristics_status", "Inverse_Time_Characteristics_status",
+    "Definite_Time_Characteristics_status", "Differential_Relay_Characteristics_status",
+    "Trip_button", "Reset_button",
+)
+
+# Rows added after Reset_button (B68..B105). A workbook without them reads
+# them as None, and the relay falls back to its built-in defaults.
+PROTECTION_TIMING_FIELDS = (
+    # Definite-time delay in seconds, one per element above
+    *(field[:-len("_status")] + "_delay" for field in BASE_SETTINGS_FIELDS[:60:2]),
+    # Differential elements are enabled one by one; a DC side facing an AC side must stay off
+    "phase_a_differential_status", "phase_b_differential_status",
+    "phase_c_differential_status", "dc_differential_status",
+    "differential_pickup", "differential_slope", "differential_ratio", "differential_security_delay",
+)
+
+SETTINGS_FIELDS = BASE_SETTINGS_FIELDS + PROTECTION_TIMING_FIELDS
+
+# Immutable snapshot of the relay settings. Still a tuple, so callers can unpack it.
+RelaySettings = namedtuple("RelaySettings", SETTINGS_FIELDS)
+
+EMPTY_SETTINGS = RelaySettings(*([None] * len(SETTINGS_FIELDS)))
+
+def load_settings(file_path, sheet_name, cells):
+    """Reads the settings cells in one streaming pass. Raises if the workbook is unreadable."""
+    if len(cells) != len(SETTINGS_FIELDS):
+        raise ValueError(f"Expected {len(SETTINGS_FIELDS)} cells, got {len(cells)}")
+
+    positions = []
+    for cell in cells:
+        column, row = coordinate_from_string(cell)
+        positions.append((row, column_index_from_string(column)))
+    min_row = min(r for r, _ in positions)
+    min_col = min(c for _, c in positions)
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        grid = list(workbook[sheet_name].iter_rows(
+            min_row=min_row, max_row=max(r for r, _ in positions),
+            min_col=min_col, max_col=max(c for _, c in positions),
+            values_only=True))
+    finally:
+        workbook.close()
+
+    values = []
+    for row, col in positions:
+        try:
+            values.append(grid[row - min_row][col - min_col])
+        except IndexError:
+            values.append(None)  # Cell beyond the sheet's used range
+    return RelaySettings(*values)
+
+class SettingsCache:
+    """Keeps the last good RelaySettings and reloads only when the workbook changes.
+
+    The file's mtime and size are checked on every get(); the workbook is only
+    parsed when they differ from the last successful load. If a reload fails,
+    e.g. because the GUI is part way through saving, the previous snapshot is
+    returned and the load is retried on the next call.
+    """
+
+    def __init__(self, file_path, sheet_name, cells):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.cells = tuple(cells)
+        self.settings = EMPTY_SETTINGS
+        self.file_state = None
+
+    def get(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError as e:
+            print(f"Excel Read Error: {e}")
+            return self.settings
+
+        file_state = (stat.st_mtime_ns, stat.st_size)
+        if file_state != self.file_state:
+            try:
+                self.settings = load_settings(self.file_path, self.sheet_name, self.cells)
+                self.file_state = file_state
+            except Exception as e:
+                print(f"Excel Read Error: {e} - keeping previous settings")
+        return self.settings
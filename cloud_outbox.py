@@ -0,0 +1,199 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from cloud_rows import SingleRowTable, is_rejected, upsert_rows
+
+logger = logging.getLogger(__name__)
+
+UPSERT = "upsert"
+SINGLE_ROW = "single_row"
+
+class CloudOutbox:
+    """Durable queue that every cloud write goes through.
+
+    upsert() and update_row() only append to a local SQLite database (WAL
+    mode) and return, so callers never wait on the network. A sender thread
+    drains it oldest first, one table at a time:
+
+    - consecutive upserts to the same table are sent together, up to
+      batch_rows rows per request (a row repeated within the batch is sent once,
+      with its latest values);
+    - update_row() replaces any update of the same table still queued behind
+      the table's other writes, so a live table never has more than one entry
+      waiting; it is written through SingleRowTable (one upsert on the cached
+      row id);
+    - a failed request is retried after an exponential backoff (retry_delay
+      doubling up to max_retry_delay) for that table only, and nothing later
+      for the table is sent before it, so each table's writes stay in order;
+    - a request the server refuses outright (bad data rather than a network
+      failure, see cloud_rows.is_rejected) is logged and dropped, since
+      resending it would only stop the table for good.
+
+    Entries are deleted only after the server has accepted (or refused) them,
+    so queued writes survive network outages and restarts. upsert() queues at
+    most max_pending entries per table and returns False instead of queueing
+    past that, so a long outage cannot fill the disk.
+    """
+
+    def __init__(self, client, path, batch_rows=500, retry_delay=1.0, max_retry_delay=300.0, max_pending=100000):
+        self.client = client
+        self.path = path
+        self.batch_rows = batch_rows
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # Durable across crashes; power loss may drop the last writes
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target TEXT NOT NULL,
+                action TEXT NOT NULL,
+                key TEXT,
+                payload TEXT NOT NULL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS outbox_target ON outbox (target, id)")
+        self.single_rows = {}
+        self.failures = {}  # Table -> (consecutive failures, time.monotonic() of the next attempt)
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="cloud-outbox", daemon=True)
+
+    def start(self):
+        pending = self.pending()
+        if pending:
+            logger.info(f"{pending} cloud writes waiting in {self.path}")
+        self.thread.start()
+        return self
+
+    def stop(self, drain_timeout=5.0):
+        """Stops the sender, first giving it up to drain_timeout seconds to send what is queued.
+
+        Anything still unsent (e.g. while the link is down) stays queued for
+        the next start. Calling stop() again does nothing.
+        """
+        if self.stopped.is_set():
+            return
+        deadline = time.monotonic() + drain_timeout
+        while (self.thread.is_alive() and not self.failures and self.pending()
+               and time.monotonic() < deadline):
+            time.sleep(0.05)
+        self.stopped.set()
+        self.wakeup.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        with self.lock:
+            self.db.close()
+
+    def _enqueue(self, entries):
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT INTO outbox (target, action, key, payload) VALUES (?, ?, ?, ?)", entries)
+            self.db.execute("COMMIT")
+        self.wakeup.set()
+
+    def upsert(self, table, rows, key='computer_ts'):
+        """Queues rows to be upserted into table on the key column.
+
+        Returns False, queueing nothing, if that would take the table past
+        max_pending entries; the caller keeps the rows and offers them again later.
+        """
+        if self.pending(table) + len(rows) > self.max_pending:
+            return False
+        self._enqueue([(table, UPSERT, key, json.dumps(row)) for row in rows])
+        return True
+
+    def update_row(self, table, data):
+        """Queues an update of a table that holds a single live row, superseding a queued one."""
+        with self.lock:
+            self.db.execute("BEGIN")
+            # Only the trailing updates: one queued before another kind of write stays in order
+            self.db.execute("DELETE FROM outbox WHERE target = ? AND action = ? AND id > "
+                            "(SELECT COALESCE(MAX(id), 0) FROM outbox WHERE target = ? AND action != ?)",
+                            (table, SINGLE_ROW, table, SINGLE_ROW))
+            self.db.execute("INSERT INTO outbox (target, action, key, payload) VALUES (?, ?, ?, ?)",
+                            (table, SINGLE_ROW, None, json.dumps(data)))
+            self.db.execute("COMMIT")
+        self.wakeup.set()
+
+    def pending(self, table=None):
+        """Number of queued entries, for one table or all of them."""
+        with self.lock:
+            if table is None:
+                return self.db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+            return self.db.execute("SELECT COUNT(*) FROM outbox WHERE target = ?", (table,)).fetchone()[0]
+
+    def _run(self):
+        while not self.stopped.is_set():
+            timeout = self._send_due()
+            if timeout != 0:
+                self.wakeup.wait(timeout)
+                self.wakeup.clear()
+
+    def _send_due(self):
+        """Sends one batch for every table that is not backing off.
+
+        Returns 0 if more may be ready straight away, otherwise the seconds
+        until the next retry is due (None if the outbox is empty).
+        """
+        with self.lock:
+            targets = [row[0] for row in self.db.execute("SELECT DISTINCT target FROM outbox")]
+        now = time.monotonic()
+        timeout = None
+        for target in targets:
+            if self.stopped.is_set():
+                return None
+            failures, retry_at = self.failures.get(target, (0, now))
+            if retry_at > now:
+                wait = retry_at - now
+                timeout = wait if timeout is None else min(timeout, wait)
+                continue
+            if self._send_batch(target):
+                self.failures.pop(target, None)
+                timeout = 0
+            else:
+                failures += 1
+                wait = min(self.retry_delay * 2 ** (failures - 1), self.max_retry_delay)
+                self.failures[target] = (failures, time.monotonic() + wait)
+                timeout = wait if timeout is None else min(timeout, wait)
+        return timeout
+
+    def _send_batch(self, target):
+        """Sends the oldest run of like entries for target. Returns False if the request failed."""
+        with self.lock:
+            entries = self.db.execute("SELECT id, action, key, payload FROM outbox WHERE target = ? ORDER BY id LIMIT ?",
+                                      (target, self.batch_rows)).fetchall()
+        if not entries:
+            return True
+        _, action, key, _ = entries[0]
+        run = []
+        for entry in entries:
+            if entry[1] != action or entry[2] != key:
+                break
+            run.append(entry)
+
+        try:
+            if action == SINGLE_ROW:
+                table = self.single_rows.setdefault(target, SingleRowTable(self.client, target))
+                table.update(json.loads(run[-1][3]))  # Only the newest state matters
+            else:
+                upsert_rows(self.client, target, [json.loads(entry[3]) for entry in run], key)
+        except Exception as e:
+            if not is_rejected(e):
+                failures = self.failures.get(target, (0, 0))[0]
+                if not failures:
+                    logger.error(f"Cloud write to {target} failed, {self.pending()} writes queued: {e}")
+                return False
+            logger.error(f"{target} refused {len(run)} queued writes, dropping them: {e}")
+
+        with self.lock:
+            # The run is the oldest entries for target, so this deletes exactly those
+            self.db.execute("DELETE FROM outbox WHERE target = ? AND id <= ?", (target, run[-1][0]))
+        if self.failures.get(target):
+            logger.info(f"Cloud writes to {target} resumed")
+        return True
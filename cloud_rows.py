@@ -0,0 +1,65 @@
+from datetime import datetime
+
+try:
+    from postgrest.exceptions import APIError
+except ImportError:  # Without postgrest every failed write is treated as retryable
+    APIError = None
+
+# PostgreSQL error classes (cardinality, data, integrity, syntax/undefined column)
+# and PostgREST request errors that mean the rows themselves were refused
+REJECTED_CODES = ("21", "22", "23", "42", "PGRST1", "PGRST2")
+
+def sample_payload(sample):
+    """Cloud row for a sample_schema.Sample: ISO computer_ts and one float per meter column."""
+    data = {'computer_ts': datetime.fromisoformat(sample.computer_ts).isoformat()}
+    data.update(sample.as_dict())
+    return data
+
+def upsert_rows(client, table, rows, key='computer_ts'):
+    """Writes rows in one request, replacing any that already exist with the same key.
+
+    PostgreSQL refuses an upsert that touches the same row twice, so rows
+    sharing a key are sent once, with the values of the last of them.
+    """
+    unique = {}
+    for row in rows:
+        unique.pop(row.get(key), None)  # Keep the latest values, in their latest position
+        unique[row.get(key)] = row
+    client.table(table).upsert(list(unique.values()), on_conflict=key).execute()
+
+def is_rejected(error):
+    """True if the server answered a write with an error that retrying cannot fix (bad data or schema)."""
+    if APIError is None or not isinstance(error, APIError):
+        return False  # Network failures and timeouts are worth retrying
+    return str(error.code or '').startswith(REJECTED_CODES)
+
+class SingleRowTable:
+    """A cloud table that holds one live row, e.g. the current device status.
+
+    The row id is looked up once (the first existing row, or the one inserted
+    when the table is empty) and cached. Every later update is a single upsert
+    on that id, so an update costs one request however many rows the table has
+    ever held, and a row deleted on the server is simply recreated.
+    """
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.row_id = None
+
+    def _resolve(self, data):
+        """Returns (row id, True if data was inserted to create the row)."""
+        result = self.client.table(self.table).select('id').order('id').limit(1).execute()
+        if result.data:
+            return result.data[0]['id'], False
+        result = self.client.table(self.table).insert(data).execute()
+        return result.data[0]['id'], True
+
+    def update(self, data):
+        """Writes data to the row. Returns "inserted" or "updated"."""
+        if self.row_id is None:
+            self.row_id, inserted = self._resolve(data)
+            if inserted:
+                return "inserted"
+        self.client.table(self.table).upsert({'id': self.row_id, **data}).execute()
+        return "updated"
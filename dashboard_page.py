@@ -7,15 +7,28 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
 from settings_page import SettingsPage
+from sample_schema import (A_PHASE_CURRENT, A_PHASE_VOLTAGE, DC_CURRENT, DC_VOLTAGE, FREQUENCY, PHASE_COLUMNS,
+                           PHASE_POWER_COLUMNS, TEMPERATURE, read_last_sample)
+from event_coalescer import EventCoalescer
 
 class CSVFileHandler(FileSystemEventHandler):
-    def __init__(self, dashboard):
+    def __init__(self, dashboard, min_interval=0.1):
         self.dashboard = dashboard
+        # One refresh per burst of events on a file, at most every min_interval seconds
+        self.coalescer = EventCoalescer(self.refresh, min_interval=min_interval, name="dashboard-refresh").start()
+
+    def refresh(self, path):
+        # Run the update on the main thread to avoid tkinter threading issues
+        self.dashboard.after(0, self.dashboard.update_from_files)
 
     def on_modified(self, event):
         if not event.is_directory and event.src_path.endswith('.csv'):
-            # Run the update on the main thread to avoid tkinter threading issues
-            self.dashboard.after(0, self.dashboard.update_from_files)
+            self.coalescer.submit(event.src_path)
+
+    def on_moved(self, event):
+        # The loggers publish each snapshot by renaming a temp file over it
+        if not event.is_directory and event.dest_path.endswith('.csv'):
+            self.coalescer.submit(event.dest_path)
 
 class DashboardPage(ctk.CTkFrame):
     def __init__(self, parent, font_family):
@@ -454,16 +467,16 @@ class DashboardPage(ctk.CTkFrame):
 
     def setup_file_watchers(self):
         # Create an event handler and observer
-        event_handler = CSVFileHandler(self)
+        self.file_events = CSVFileHandler(self)
         self.observer = Observer()
         
         # Watch Input folder
         input_path = 'Input Real Time Data'
-        self.observer.schedule(event_handler, input_path, recursive=False)
+        self.observer.schedule(self.file_events, input_path, recursive=False)
         
         # Watch Output folder
         output_path = 'Output Real Time Data'
-        self.observer.schedule(event_handler, output_path, recursive=False)
+        self.observer.schedule(self.file_events, output_path, recursive=False)
         
         # Start the observer in a separate thread
         self.observer.start()
@@ -473,17 +486,11 @@ class DashboardPage(ctk.CTkFrame):
             input_file_path = os.path.join('Input Real Time Data', 'Real-time data for GUI.csv')
             output_file_path = os.path.join('Output Real Time Data', 'Real-time data for GUI.csv')
             
-            # Read input data
-            with open(input_file_path, 'r') as file:
-                input_lines = file.readlines()
-                if len(input_lines) > 1:
-                    input_data = input_lines[-1].strip().split(',')
-            
-            # Read output data
-            with open(output_file_path, 'r') as file:
-                output_lines = file.readlines()
-                if len(output_lines) > 1:
-                    output_data = output_lines[-1].strip().split(',')
+            # Read the latest input and output samples (parsed once, shared by every panel)
+            input_data = read_last_sample(input_file_path)
+            output_data = read_last_sample(output_file_path)
+            if input_data is None or output_data is None:
+                return
             
             config = self.config_menu.get()
             
@@ -504,11 +511,11 @@ class DashboardPage(ctk.CTkFrame):
                 self.update_single_phase_values(input_data, output_data)
             
             # Update common metrics using input data
-            self.frequency.configure(text=f"{float(input_data[19]):.2f} Hz")
-            self.temperature.configure(text=f"{float(input_data[21]):.2f} °C")
+            self.frequency.configure(text=f"{input_data[FREQUENCY]:.2f} Hz")
+            self.temperature.configure(text=f"{input_data[TEMPERATURE]:.2f} °C")
                     
             # Update energy panel with current phase
-            self.update_energy_values()
+            self.update_energy_values(sample=input_data)
         
         except Exception as e:
             print(f"Error updating values: {e}")
@@ -522,6 +529,7 @@ class DashboardPage(ctk.CTkFrame):
         if hasattr(self, 'observer'):
             self.observer.stop()
             self.observer.join()
+            self.file_events.coalescer.stop()
 
     def create_measurement_panels(self):
         # Create frame for measurement panels
@@ -861,100 +869,93 @@ class DashboardPage(ctk.CTkFrame):
     # Add these helper methods for updating values
     def update_three_phase_values(self, input_data, output_data):
         # Input values
-        for phase, idx in [('A', 1), ('B', 7), ('C', 13)]:
-            self.measurement_labels[f'Input_Voltage_Phase {phase}'].configure(text=f"{float(input_data[idx]):.2f} V")
-            self.measurement_labels[f'Input_Current_Phase {phase}'].configure(text=f"{float(input_data[idx+1]):.2f} A")
+        for phase, (voltage, current) in PHASE_COLUMNS.items():
+            self.measurement_labels[f'Input_Voltage_Phase {phase}'].configure(text=f"{input_data[voltage]:.2f} V")
+            self.measurement_labels[f'Input_Current_Phase {phase}'].configure(text=f"{input_data[current]:.2f} A")
         
         # Output values from output data file
-        for phase, idx in [('A', 1), ('B', 7), ('C', 13)]:
-            self.measurement_labels[f'Output_Voltage_Phase {phase}'].configure(text=f"{float(output_data[idx]):.2f} V")
-            self.measurement_labels[f'Output_Current_Phase {phase}'].configure(text=f"{float(output_data[idx+1]):.2f} A")
+        for phase, (voltage, current) in PHASE_COLUMNS.items():
+            self.measurement_labels[f'Output_Voltage_Phase {phase}'].configure(text=f"{output_data[voltage]:.2f} V")
+            self.measurement_labels[f'Output_Current_Phase {phase}'].configure(text=f"{output_data[current]:.2f} A")
 
     def update_dc_values(self, input_data, output_data):
         # Update DC input from input data
-        self.measurement_labels['Input_Voltage_DC'].configure(text=f"{float(input_data[20]):.2f} V")
-        self.measurement_labels['Input_Current_DC'].configure(text=f"{float(input_data[21]):.2f} A")
+        self.measurement_labels['Input_Voltage_DC'].configure(text=f"{input_data[DC_VOLTAGE]:.2f} V")
+        self.measurement_labels['Input_Current_DC'].configure(text=f"{input_data[DC_CURRENT]:.2f} A")
         
         # Update DC output from output data
-        self.measurement_labels['Output_Voltage_DC'].configure(text=f"{float(output_data[20]):.2f} V")
-        self.measurement_labels['Output_Current_DC'].configure(text=f"{float(output_data[21]):.2f} A")
+        self.measurement_labels['Output_Voltage_DC'].configure(text=f"{output_data[DC_VOLTAGE]:.2f} V")
+        self.measurement_labels['Output_Current_DC'].configure(text=f"{output_data[DC_CURRENT]:.2f} A")
 
     def update_dc_to_three_phase_values(self, input_data, output_data):
         # Input DC values
-        self.measurement_labels['Input_Voltage_DC'].configure(text=f"{float(input_data[20]):.2f} V")
-        self.measurement_labels['Input_Current_DC'].configure(text=f"{float(input_data[21]):.2f} A")
+        self.measurement_labels['Input_Voltage_DC'].configure(text=f"{input_data[DC_VOLTAGE]:.2f} V")
+        self.measurement_labels['Input_Current_DC'].configure(text=f"{input_data[DC_CURRENT]:.2f} A")
         
         # Output three-phase values
-        for phase, idx in [('A', 1), ('B', 7), ('C', 13)]:
-            self.measurement_labels[f'Output_Voltage_Phase {phase}'].configure(text=f"{float(output_data[idx]):.2f} V")
-            self.measurement_labels[f'Output_Current_Phase {phase}'].configure(text=f"{float(output_data[idx+1]):.2f} A")
+        for phase, (voltage, current) in PHASE_COLUMNS.items():
+            self.measurement_labels[f'Output_Voltage_Phase {phase}'].configure(text=f"{output_data[voltage]:.2f} V")
+            self.measurement_labels[f'Output_Current_Phase {phase}'].configure(text=f"{output_data[current]:.2f} A")
 
     def update_three_phase_to_dc_values(self, input_data, output_data):
         # Input three-phase values
-        for phase, idx in [('A', 1), ('B', 7), ('C', 13)]:
-            self.measurement_labels[f'Input_Voltage_Phase {phase}'].configure(text=f"{float(input_data[idx]):.2f} V")
-            self.measurement_labels[f'Input_Current_Phase {phase}'].configure(text=f"{float(input_data[idx+1]):.2f} A")
+        for phase, (voltage, current) in PHASE_COLUMNS.items():
+            self.measurement_labels[f'Input_Voltage_Phase {phase}'].configure(text=f"{input_data[voltage]:.2f} V")
+            self.measurement_labels[f'Input_Current_Phase {phase}'].configure(text=f"{input_data[current]:.2f} A")
         
         # Output DC values
-        self.measurement_labels['Output_Voltage_DC'].configure(text=f"{float(output_data[20]):.2f} V")
-        self.measurement_labels['Output_Current_DC'].configure(text=f"{float(output_data[21]):.2f} A")
+        self.measurement_labels['Output_Voltage_DC'].configure(text=f"{output_data[DC_VOLTAGE]:.2f} V")
+        self.measurement_labels['Output_Current_DC'].configure(text=f"{output_data[DC_CURRENT]:.2f} A")
 
     def update_single_phase_values(self, input_data, output_data):
         # Input single-phase values (using phase A values)
-        self.measurement_labels['Input_Voltage_AC'].configure(text=f"{float(input_data[1]):.2f} V")
-        self.measurement_labels['Input_Current_AC'].configure(text=f"{float(input_data[2]):.2f} A")
+        self.measurement_labels['Input_Voltage_AC'].configure(text=f"{input_data[A_PHASE_VOLTAGE]:.2f} V")
+        self.measurement_labels['Input_Current_AC'].configure(text=f"{input_data[A_PHASE_CURRENT]:.2f} A")
         
         # Output single-phase values
-        self.measurement_labels['Output_Voltage_AC'].configure(text=f"{float(output_data[1]):.2f} V")
-        self.measurement_labels['Output_Current_AC'].configure(text=f"{float(output_data[2]):.2f} A")
+        self.measurement_labels['Output_Voltage_AC'].configure(text=f"{output_data[A_PHASE_VOLTAGE]:.2f} V")
+        self.measurement_labels['Output_Current_AC'].configure(text=f"{output_data[A_PHASE_CURRENT]:.2f} A")
 
     def update_single_phase_to_dc_values(self, input_data, output_data):
         # Input single-phase values
-        self.measurement_labels['Input_Voltage_AC'].configure(text=f"{float(input_data[1]):.2f} V")
-        self.measurement_labels['Input_Current_AC'].configure(text=f"{float(input_data[2]):.2f} A")
+        self.measurement_labels['Input_Voltage_AC'].configure(text=f"{input_data[A_PHASE_VOLTAGE]:.2f} V")
+        self.measurement_labels['Input_Current_AC'].configure(text=f"{input_data[A_PHASE_CURRENT]:.2f} A")
         
         # Output DC values
-        self.measurement_labels['Output_Voltage_DC'].configure(text=f"{float(output_data[20]):.2f} V")
-        self.measurement_labels['Output_Current_DC'].configure(text=f"{float(output_data[21]):.2f} A")
+        self.measurement_labels['Output_Voltage_DC'].configure(text=f"{output_data[DC_VOLTAGE]:.2f} V")
+        self.measurement_labels['Output_Current_DC'].configure(text=f"{output_data[DC_CURRENT]:.2f} A")
 
     def update_dc_to_single_phase_values(self, input_data, output_data):
         # Input DC values
-        self.measurement_labels['Input_Voltage_DC'].configure(text=f"{float(input_data[20]):.2f} V")
-        self.measurement_labels['Input_Current_DC'].configure(text=f"{float(input_data[21]):.2f} A")
+        self.measurement_labels['Input_Voltage_DC'].configure(text=f"{input_data[DC_VOLTAGE]:.2f} V")
+        self.measurement_labels['Input_Current_DC'].configure(text=f"{input_data[DC_CURRENT]:.2f} A")
         
         # Output single-phase values
-        self.measurement_labels['Output_Voltage_AC'].configure(text=f"{float(output_data[1]):.2f} V")
-        self.measurement_labels['Output_Current_AC'].configure(text=f"{float(output_data[2]):.2f} A")
+        self.measurement_labels['Output_Voltage_AC'].configure(text=f"{output_data[A_PHASE_VOLTAGE]:.2f} V")
+        self.measurement_labels['Output_Current_AC'].configure(text=f"{output_data[A_PHASE_CURRENT]:.2f} A")
 
-    def update_energy_values(self, selected_phase=None):
+    def update_energy_values(self, selected_phase=None, sample=None):
         try:
-            input_file_path = os.path.join('Input Real Time Data', 'Real-time data for GUI.csv')
-            
-            with open(input_file_path, 'r') as file:
-                lines = file.readlines()
-                if len(lines) > 1:
-                    data = lines[-1].strip().split(',')
-                    
-                    # Get indices based on selected phase
-                    phase_indices = {
-                        "Phase A": (3, 4, 5, 6),    # Active, Reactive, Apparent, PF for Phase A
-                        "Phase B": (9, 10, 11, 12),  # Active, Reactive, Apparent, PF for Phase B
-                        "Phase C": (15, 16, 17, 18)  # Active, Reactive, Apparent, PF for Phase C
-                    }
-                    
-                    selected = self.phase_selector.get()
-                    indices = phase_indices[selected]
-                    
-                    # Update energy metrics for selected phase
-                    self.active_energy.configure(text=f"{float(data[indices[0]]):.2f} kW")
-                    self.reactive_energy.configure(text=f"{float(data[indices[1]]):.2f} kVAR")
-                    self.apparent_power.configure(text=f"{float(data[indices[2]]):.2f} kVA")
-                    self.power_factor.configure(text=f"{float(data[indices[3]]):.2f}")
-                    
-                    # These values are common for all phases
-                    self.frequency.configure(text=f"{float(data[19]):.2f} Hz")
-                    self.temperature.configure(text=f"{float(data[21]):.2f} °C")
-                    
+            if sample is None:
+                input_file_path = os.path.join('Input Real Time Data', 'Real-time data for GUI.csv')
+                sample = read_last_sample(input_file_path)
+            if sample is None:
+                return
+
+            # Active, Reactive, Apparent, PF columns for the selected phase
+            selected = self.phase_selector.get()
+            indices = PHASE_POWER_COLUMNS[selected.split()[-1]]
+
+            # Update energy metrics for selected phase
+            self.active_energy.configure(text=f"{sample[indices[0]]:.2f} kW")
+            self.reactive_energy.configure(text=f"{sample[indices[1]]:.2f} kVAR")
+            self.apparent_power.configure(text=f"{sample[indices[2]]:.2f} kVA")
+            self.power_factor.configure(text=f"{sample[indices[3]]:.2f}")
+
+            # These values are common for all phases
+            self.frequency.configure(text=f"{sample[FREQUENCY]:.2f} Hz")
+            self.temperature.configure(text=f"{sample[TEMPERATURE]:.2f} °C")
+
         except Exception as e:
             print(f"Error updating energy values: {e}")
 
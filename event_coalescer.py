@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class EventCoalescer:
+    """Collapses bursts of file events into one callback per path.
+
+    submit(path) can be called from any thread (e.g. a watchdog handler) for
+    every event. callback(path) then runs on the coalescer's own thread
+    settle seconds after the first event of a burst, and at most once every
+    min_interval seconds per path. An event that arrives while a call for its
+    path is pending is folded into it and counted in dropped; one that
+    arrives during or after a call schedules another, so the last content
+    written is always processed.
+    """
+
+    def __init__(self, callback, min_interval=0.5, settle=0.02, name="event-coalescer"):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.settle = settle
+        self.pending = {}     # Path -> time.monotonic() the call is due
+        self.last_call = {}   # Path -> time.monotonic() of its last call
+        self.submitted = 0
+        self.dropped = 0
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+    def submit(self, path):
+        now = time.monotonic()
+        with self.condition:
+            self.submitted += 1
+            if path in self.pending:
+                self.dropped += 1  # The pending call reads the file after this event anyway
+                return
+            self.pending[path] = max(now + self.settle, self.last_call.get(path, 0) + self.min_interval)
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.stopped:
+                        return
+                    now = time.monotonic()
+                    due = min(self.pending.items(), key=lambda item: item[1], default=None)
+                    if due is not None and due[1] <= now:
+                        break
+                    self.condition.wait(None if due is None else due[1] - now)
+                path = due[0]
+                del self.pending[path]
+                self.last_call[path] = now
+            try:
+                self.callback(path)
+            except Exception:
+                logger.exception(f"Error handling file event for {path}")
@@ -1,3 +1,4 @@
+import atexit
 import os
 import time
 import pandas as pd
@@ -6,6 +7,7 @@ from dotenv import load_dotenv
 import logging
 from openpyxl import load_workbook
 import threading
+from cloud_outbox import CloudOutbox
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +24,9 @@ supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(supabase_url, supabase_key)
 
+# Device status writes are queued here and sent by a background thread
+outbox = CloudOutbox(supabase, 'device_status_outbox.db')
+
 def update_parameters(xlsx_path):
     try:
         # Get data from Supabase parameters_table
@@ -53,10 +58,13 @@ def update_parameters(xlsx_path):
                     excel_value = ws[f'B{row}'].value
                     supabase_value = supabase_params[param]
                     
-                    # Convert values to integers for comparison
+                    # Convert values to numbers for comparison (delays and the
+                    # differential slope/ratio are fractional, so not to integers)
                     try:
-                        excel_value = int(float(excel_value)) if excel_value is not None else 0
-                        supabase_value = int(float(supabase_value)) if supabase_value is not None else 0
+                        excel_value = float(excel_value) if excel_value is not None else 0.0
+                        supabase_value = float(supabase_value) if supabase_value is not None else 0.0
+                        if supabase_value.is_integer():
+                            supabase_value = int(supabase_value)  # Statuses stay 0/1
                         
                         # Update if values are different
                         if excel_value != supabase_value:
@@ -103,18 +111,8 @@ def update_relay_status(xlsx_path):
         }
 
         try:
-            # Get existing row if any
-            result = supabase.table('device_status').select('id').execute()
-            
-            if result.data:
-                # Update existing row
-                row_id = result.data[0]['id']
-                supabase.table('device_status').update(data).eq('id', row_id).execute()
-                logger.info(f"Updated device status with timestamp: {data['timestamp']}")
-            else:
-                # Insert new row
-                result = supabase.table('device_status').insert(data).execute()
-                logger.info(f"Inserted new device status with timestamp: {data['timestamp']}")
+            outbox.update_row('device_status', data)
+            logger.info(f"Queued device status with timestamp: {data['timestamp']}")
                 
         except Exception as e:
             logger.error(f"Error updating device_status table: {str(e)}")
@@ -127,6 +125,9 @@ def start_monitoring():
     relay_path = "Relay_indication.xlsx"
     
     logger.info(f"Starting monitoring service for:\n{params_path}\n{relay_path}")
+    outbox.start()
+    # Also runs when this loop is a daemon thread that never returns (run_excel_updater)
+    atexit.register(outbox.stop)
     
     try:
         while True:
@@ -135,6 +136,8 @@ def start_monitoring():
             time.sleep(1)  # Check every second
     except KeyboardInterrupt:
         logger.info("Stopping monitoring service")
+    finally:
+        outbox.stop()
 
 def run_excel_updater():
     excel_thread = threading.Thread(target=start_monitoring, daemon=True)
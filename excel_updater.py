@@ -1,6 +1,5 @@
 import os
 import time
-import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import logging
@@ -53,10 +52,13 @@ def update_parameters(xlsx_path):
                     excel_value = ws[f'B{row}'].value
                     supabase_value = supabase_params[param]
                     
-                    # Convert values to integers for comparison
+                    # Convert values to numbers for comparison (delays and the
+                    # differential slope/ratio are fractional, so not to integers)
                     try:
-                        excel_value = int(float(excel_value)) if excel_value is not None else 0
-                        supabase_value = int(float(supabase_value)) if supabase_value is not None else 0
+                        excel_value = float(excel_value) if excel_value is not None else 0.0
+                        supabase_value = float(supabase_value) if supabase_value is not None else 0.0
+                        if supabase_value.is_integer():
+                            supabase_value = int(supabase_value)  # Statuses stay 0/1
                         
                         # Update if values are different
                         if excel_value != supabase_value:
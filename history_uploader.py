@@ -0,0 +1,185 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+
+try:
+    import zstandard
+except ImportError:  # .zst segments are skipped without the zstandard package
+    zstandard = None
+
+from sample_schema import parse_line
+from cloud_rows import sample_payload
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = "power_log_*.csv"
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+DONE = "done"
+
+def list_segments(log_dir):
+    """Segment name (power_log_<timestamp>.csv) -> path, oldest first.
+
+    A segment the compressor has replaced is listed under its original name
+    with the .gz/.zst path, so its upload offset stays valid across compression.
+    """
+    segments = {}
+    for suffix in COMPRESSED_SUFFIXES:
+        for path in glob.glob(os.path.join(log_dir, SEGMENT_PATTERN + suffix)):
+            segments[os.path.basename(path)[:-len(suffix)]] = path
+    for path in glob.glob(os.path.join(log_dir, SEGMENT_PATTERN)):
+        segments[os.path.basename(path)] = path  # Plain file wins while both exist
+    return dict(sorted(segments.items()))
+
+def open_segment(path):
+    """Opens a segment for binary reading, decompressing .gz and .zst on the fly."""
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rb')
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise OSError(f"zstandard not installed, cannot read {path}")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+class HistoryUploader:
+    """Uploads every row of the power logs to the cloud in batches.
+
+    sources maps a table to the log directory its port writes to. Each
+    segment is read from the byte offset reached so far, and complete rows
+    are queued on the CloudOutbox batch_rows at a time as one upsert on
+    computer_ts; the outbox sends them with its batching and backoff, so a
+    batch that is resent after a restart simply overwrites itself. Offsets
+    are saved to state_path after every batch the outbox has taken. While
+    the outbox holds as many rows for a table as it will queue, the pass
+    stops and the rest stay on disk until the next one.
+    Rotated and compressed segments are finished from their .gz/.zst copy;
+    a segment is marked done once a newer one exists and it has been read
+    to the end.
+    """
+
+    def __init__(self, outbox, sources, state_path, batch_rows=500, interval=5.0, retry_delay=5.0,
+                 chunk_bytes=1024 * 1024):
+        self.outbox = outbox
+        self.sources = sources
+        self.state_path = state_path
+        self.batch_rows = batch_rows
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.chunk_bytes = chunk_bytes
+        self.state = self._load_state()
+        self.rows_queued = 0
+        self.backlogged = set()  # Tables the outbox was last found full for
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="history-uploader", daemon=True)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read upload state {self.state_path}, starting over: {e}")
+            return {}
+
+    def _save_state(self):
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        delay = 0
+        while not self.stopped.wait(delay):
+            try:
+                for table, log_dir in self.sources.items():
+                    self.upload_table(table, log_dir)
+                delay = self.interval
+            except Exception as e:
+                logger.error(f"Reading the power logs failed, retrying in {self.retry_delay} s: {e}")
+                delay = self.retry_delay
+
+    def upload_table(self, table, log_dir):
+        """Queues every row of log_dir not yet uploaded to table, as far as the outbox takes them."""
+        segments = list_segments(log_dir)
+        offsets = self.state.setdefault(table, {})
+        for name in list(offsets):
+            if name not in segments:
+                del offsets[name]  # Deleted from disk
+        newest = next(reversed(segments), None)
+        for name, path in segments.items():
+            if offsets.get(name) == DONE:
+                continue
+            if self.stopped.is_set():
+                return
+            try:
+                finished = self._upload_segment(table, name, path)
+            except FileNotFoundError:
+                return  # Compressed away under us, picked up as .gz/.zst next pass
+            except OSError as e:
+                logger.error(f"Could not read log segment {path}: {e}")
+                continue
+            if not finished:
+                return  # Stopped, or the outbox is full for this table
+            if name != newest:
+                offsets[name] = DONE
+                self._save_state()
+
+    def _upload_segment(self, table, name, path):
+        """Queues a segment from its saved offset. Returns True once it was read to the end."""
+        offsets = self.state[table]
+        offset = offsets.get(name, 0)
+        rows = []
+        carry = b''  # A row cut off at the end of a chunk, or still being written
+        with open_segment(path) as f:
+            f.seek(offset)
+            while True:
+                if self.stopped.is_set():
+                    return False
+                data = f.read(self.chunk_bytes)
+                if not data:
+                    break
+                data = carry + data
+                end = data.rfind(b'\n') + 1
+                carry = data[end:]
+                position = offset
+                for line in data[:end].splitlines(keepends=True):
+                    position += len(line)
+                    sample = parse_line(line.decode(errors='ignore'))
+                    if sample is not None:  # Header and damaged rows are skipped
+                        rows.append(sample_payload(sample))
+                    if len(rows) >= self.batch_rows:
+                        if not self._send(table, rows):
+                            return False
+                        rows = []
+                        offsets[name] = position
+                        self._save_state()
+                offset += end
+        if rows and not self._send(table, rows):
+            return False
+        if offsets.get(name, 0) != offset:
+            offsets[name] = offset
+            self._save_state()
+        return True
+
+    def _send(self, table, rows):
+        """Queues rows on the outbox. Returns False if it is full for table."""
+        if not self.outbox.upsert(table, rows):
+            if table not in self.backlogged:
+                logger.warning(f"Cloud outbox full for {table}, resuming the log upload once it drains")
+                self.backlogged.add(table)
+            return False
+        self.backlogged.discard(table)
+        self.rows_queued += len(rows)
+        logger.info(f"Queued {len(rows)} log rows for {table}")
+        return True
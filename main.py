@@ -1,12 +1,16 @@
 import os
 import time
-import pandas as pd
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import logging
 from excel_updater import run_excel_updater
+from sample_schema import read_last_sample
+from cloud_rows import sample_payload
+from cloud_outbox import CloudOutbox
+from history_uploader import HistoryUploader
+from event_coalescer import EventCoalescer
 
 # Configure logging
 logging.basicConfig(
@@ -23,79 +27,74 @@ supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(supabase_url, supabase_key)
 
+# Power log directory uploaded in full to each history table (one row per Computer_TS),
+# and where upload progress is kept. The *_real_time_data tables hold just the live sample.
+HISTORY_SOURCES = {
+    'input_history_data': 'Input Data Log',
+    'output_history_data': 'Output Data Log',
+}
+HISTORY_STATE_FILE = 'history_upload_state.json'
+HISTORY_BATCH_ROWS = 500
+HISTORY_INTERVAL = 1.0  # Seconds between passes; new rows reach the log at least this often
+
+# Every cloud write is queued here and sent by a background thread with per-table backoff,
+# surviving outages and restarts. Past this many queued rows per table the logs wait on disk.
+OUTBOX_MAX_PENDING = 100000
+outbox = CloudOutbox(supabase, 'cloud_outbox.db', batch_rows=HISTORY_BATCH_ROWS, max_pending=OUTBOX_MAX_PENDING)
+
+# Real-time snapshot uploads: bursts of file events collapse into one upload per file, at most this often
+REALTIME_FILE = 'Real-time data for GUI.csv'
+UPLOAD_MIN_INTERVAL = 0.5
+
 class CSVHandler(FileSystemEventHandler):
+    """Keeps the live row of input/output_real_time_data at the newest real-time sample."""
+
     def __init__(self):
-        self.last_modified = 0
-        self.last_hash = None
+        self.last_sample = {}  # Path -> Computer_TS of the last sample queued from it
+        self.coalescer = EventCoalescer(self.upload, min_interval=UPLOAD_MIN_INTERVAL, name="csv-upload").start()
 
     def on_modified(self, event):
-        if event.is_directory or not event.src_path.endswith('Real-time data for GUI.csv'):
-            return
+        if not event.is_directory and event.src_path.endswith(REALTIME_FILE):
+            self.coalescer.submit(event.src_path)
+
+    def on_moved(self, event):
+        # The loggers publish each snapshot by renaming a temp file over it
+        if not event.is_directory and event.dest_path.endswith(REALTIME_FILE):
+            self.coalescer.submit(event.dest_path)
 
+    def upload(self, path):
         try:
-            # Read the CSV file
-            df = pd.read_csv(event.src_path)
-            
-            # Get the latest row as a copy
-            latest_row = df.iloc[-1:].copy()
-            
-            # Convert timestamp
-            latest_row.loc[latest_row.index[0], 'Computer_TS'] = pd.to_datetime(latest_row['Computer_TS'].iloc[0])
+            # Only the tail of the file is read and parsed, with the shared column schema
+            sample = read_last_sample(path)
+            if sample is None or sample.computer_ts == self.last_sample.get(path):
+                return  # Nothing new since the last upload, e.g. a touch or a repeated event
             
             # Determine which table to use based on the file path
-            is_input = 'Input Real Time Data' in event.src_path
+            is_input = 'Input Real Time Data' in path
             table_name = 'input_real_time_data' if is_input else 'output_real_time_data'
-            
-            # Convert to dict and clean NaN values
-            data = {
-                'computer_ts': latest_row['Computer_TS'].iloc[0].isoformat(),
-                'A Phase Voltage': float(latest_row['A Phase Voltage'].iloc[0]),
-                'A Phase Current': float(latest_row['A Phase Current'].iloc[0]),
-                'A Phase Active Power': float(latest_row['A Phase Active Power'].iloc[0]),
-                'A Phase Reactive Power': float(latest_row['A Phase Reactive Power'].iloc[0]),
-                'A Phase Apparent Power': float(latest_row['A Phase Apparent Power'].iloc[0]),
-                'A Power Factor': float(latest_row['A Power Factor'].iloc[0]),
-                'B Phase Voltage': float(latest_row['B Phase Voltage'].iloc[0]),
-                'B Phase Current': float(latest_row['B Phase Current'].iloc[0]),
-                'B Phase Active Power': float(latest_row['B Phase Active Power'].iloc[0]),
-                'B Phase Reactive Power': float(latest_row['B Phase Reactive Power'].iloc[0]),
-                'B Phase Apparent Power': float(latest_row['B Phase Apparent Power'].iloc[0]),
-                'B Power Factor': float(latest_row['B Power Factor'].iloc[0]),
-                'C Phase Voltage': float(latest_row['C Phase Voltage'].iloc[0]),
-                'C Phase Current': float(latest_row['C Phase Current'].iloc[0]),
-                'C Phase Active Power': float(latest_row['C Phase Active Power'].iloc[0]),
-                'C Phase Reactive Power': float(latest_row['C Phase Reactive Power'].iloc[0]),
-                'C Phase Apparent Power': float(latest_row['C Phase Apparent Power'].iloc[0]),
-                'C Power Factor': float(latest_row['C Power Factor'].iloc[0]),
-                'Frequency': float(latest_row['Frequency'].iloc[0]),
-                'DC Voltage': float(latest_row['DC Voltage'].iloc[0]),
-                'DC Current': float(latest_row['DC Current'].iloc[0]),
-                'Temperature': float(latest_row['Temperature'].iloc[0])
-            }
+            data = sample_payload(sample)
 
             try:
-                # First, get all existing rows
-                result = supabase.table(table_name).select('id').execute()
-                
-                if result.data:
-                    # If rows exist, update the first one
-                    row_id = result.data[0]['id']
-                    supabase.table(table_name).update(data).eq('id', row_id).execute()
-                    logger.info(f"Updated existing row in {table_name} with timestamp: {data['computer_ts']}")
-                else:
-                    # If no rows exist, insert new row
-                    result = supabase.table(table_name).insert(data).execute()
-                    logger.info(f"Inserted new row in {table_name} with timestamp: {data['computer_ts']}")
+                # The single live row is updated in place through its cached id (SingleRowTable)
+                outbox.update_row(table_name, data)
+                self.last_sample[path] = sample.computer_ts
+                logger.info(f"Queued live row for {table_name} with timestamp: {data['computer_ts']}")
                 
             except Exception as e:
                 logger.error(f"Error updating Supabase table {table_name}: {str(e)}")
             
         except Exception as e:
-            logger.error(f"Error processing file {event.src_path}: {str(e)}")
+            logger.error(f"Error processing file {path}: {str(e)}")
 
 def main():
     # Start Excel updater in a separate thread
     excel_thread = run_excel_updater()
+    outbox.start()
+
+    # Queue every logged sample for upload in the background, a batch of rows per request
+    history = HistoryUploader(outbox, HISTORY_SOURCES, HISTORY_STATE_FILE,
+                              batch_rows=HISTORY_BATCH_ROWS, interval=HISTORY_INTERVAL).start()
+    logger.info("Started uploading power logs:\n" + "\n".join(os.path.abspath(d) for d in HISTORY_SOURCES.values()))
     
     # Create event handler for CSV monitoring
     event_handler = CSVHandler()
@@ -117,12 +116,18 @@ def main():
     
     try:
         while True:
-            time.sleep(0.01)  # Check every 10ms
+            time.sleep(1)
     except KeyboardInterrupt:
         observer.stop()
         logger.info("Stopping monitoring.")
     
     observer.join()
+    event_handler.coalescer.stop()
+    logger.info(f"Skipped {event_handler.coalescer.dropped} of {event_handler.coalescer.submitted} "
+                f"file events as redundant")
+    history.stop()
+    logger.info(f"Queued {history.rows_queued} log rows for upload this run")
+    outbox.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,303 @@
+import errno
+import mmap
+import os
+import select
+import stat
+import time
+
+import numpy as np
+
+from sample_schema import COLUMN_COUNT
+
+# Shared-memory sample handoff between the serial loggers and the relay.
+#
+# File layout (little endian):
+#   header  uint64[4]  magic, fields per record, capacity, records written
+#   slots   capacity x (uint64 seq, int64[3] times, float64[fields])
+#
+# times holds time.monotonic_ns() stamps taken by the logger when the line was
+# read from the serial port, when it was parsed and when it was published.
+# CLOCK_MONOTONIC is system wide, so the relay can subtract its own stamps.
+#
+# A slot's seq is set to BUSY while the writer fills it and to the record's
+# sequence number once it is complete. Readers check it before and after
+# copying the values, so a record that is overwritten mid-read is retried
+# instead of being returned torn.
+#
+# Next to the ring file, <ring>.notify is a FIFO: the writer puts a byte in it
+# after every publish, so a reader can sleep in select() until a record lands
+# instead of polling the shared memory.
+
+RING_MAGIC = 0x52454C4159524E32  # "RELAYRN2"
+HEADER_WORDS = 4
+BUSY = np.iinfo(np.uint64).max
+
+# Indices into a record's times
+ACQUIRED, PARSED, PUBLISHED = range(3)
+TIME_COUNT = 3
+
+DEFAULT_CAPACITY = 256
+SAMPLE_FIELDS = COLUMN_COUNT  # Computer_TS as epoch seconds + the 22 meter values
+
+INPUT_RING_PATH = "/dev/shm/relay_input_samples"
+OUTPUT_RING_PATH = "/dev/shm/relay_output_samples"
+
+NOTIFY_RETRY_INTERVAL = 1.0  # Seconds between attempts to reach a reader, or to map a missing ring
+
+def notify_path(path):
+    return path + ".notify"
+
+def make_notify_fifo(path):
+    """Creates the ring's notification FIFO if it does not exist yet. Returns its path."""
+    fifo = notify_path(path)
+    try:
+        os.mkfifo(fifo, 0o644)
+    except FileExistsError:
+        if not stat.S_ISFIFO(os.stat(fifo).st_mode):
+            raise OSError(errno.EEXIST, f"{fifo} exists and is not a FIFO")
+    return fifo
+
+def _slot_dtype(fields):
+    return np.dtype([("seq", "<u8"), ("times", "<i8", (TIME_COUNT,)), ("values", "<f8", (fields,))])
+
+class SampleRing:
+    """Fixed-size ring of float64 sample records in a memory-mapped file.
+
+    One process creates the ring and publishes records; any number of
+    processes can open it and read the latest record straight out of the
+    mapping, without touching the filesystem or parsing text.
+    """
+
+    def __init__(self, path, mapped, fields, capacity):
+        self.path = path
+        self.map = mapped
+        self.fields = fields
+        self.capacity = capacity
+        self.header = np.ndarray((HEADER_WORDS,), dtype="<u8", buffer=mapped, offset=0)
+        slots = np.ndarray((capacity,), dtype=_slot_dtype(fields), buffer=mapped,
+                           offset=HEADER_WORDS * 8)
+        self.seqs = slots["seq"]
+        self.times = slots["times"]
+        self.records = slots["values"]
+        self.notify_fd = None  # Writer end of the notification FIFO, opened once a reader is there
+        self.notify_retry_at = 0.0
+
+    @staticmethod
+    def _size(fields, capacity):
+        return HEADER_WORDS * 8 + capacity * _slot_dtype(fields).itemsize
+
+    @classmethod
+    def create(cls, path, fields=SAMPLE_FIELDS, capacity=DEFAULT_CAPACITY):
+        """Creates (or resets) the ring at path for writing."""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            size = cls._size(fields, capacity)
+            os.ftruncate(fd, size)
+            mapped = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        ring = cls(path, mapped, fields, capacity)
+        try:
+            make_notify_fifo(path)
+        except OSError as e:
+            print(f"Ring notification disabled for {path}: {e}")
+        ring.header[3] = 0
+        ring.seqs[:] = BUSY
+        ring.header[:3] = (RING_MAGIC, fields, capacity)
+        return ring
+
+    @classmethod
+    def open(cls, path):
+        """Maps an existing ring for reading. Raises ValueError if it is not a sample ring."""
+        fd = os.open(path, os.O_RDWR)
+        try:
+            size = os.fstat(fd).st_size
+            mapped = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        header = np.ndarray((HEADER_WORDS,), dtype="<u8", buffer=mapped, offset=0)
+        magic, fields, capacity = (int(v) for v in header[:3])
+        if magic != RING_MAGIC or size < cls._size(fields, capacity):
+            mapped.close()
+            raise ValueError(f"{path} is not a sample ring")
+        return cls(path, mapped, fields, capacity)
+
+    def close(self):
+        if self.notify_fd is not None:
+            os.close(self.notify_fd)
+            self.notify_fd = None
+        del self.header, self.seqs, self.times, self.records
+        self.map.close()
+
+    @property
+    def sequence(self):
+        """Number of records published so far. Changes whenever a new record lands."""
+        return int(self.header[3])
+
+    def publish(self, values, acquired=0, parsed=0):
+        """Writes one record and makes it visible to readers.
+
+        acquired/parsed are the logger's monotonic_ns stamps for the sample;
+        the published stamp is taken here.
+        """
+        seq = int(self.header[3])
+        index = seq % self.capacity
+        self.seqs[index] = BUSY
+        self.records[index] = values
+        self.times[index] = (acquired, parsed, time.monotonic_ns())
+        self.seqs[index] = seq
+        self.header[3] = seq + 1
+        self._notify()
+        return seq
+
+    def _notify(self):
+        """Wakes a RingWatcher sleeping on the FIFO. One write(); nothing to do without a reader."""
+        if self.notify_fd is None:
+            now = time.monotonic()
+            if now < self.notify_retry_at:
+                return
+            try:
+                self.notify_fd = os.open(notify_path(self.path), os.O_WRONLY | os.O_NONBLOCK)
+            except OSError:  # ENXIO: no reader has the FIFO open (or there is no FIFO)
+                self.notify_retry_at = now + NOTIFY_RETRY_INTERVAL
+                return
+        try:
+            os.write(self.notify_fd, b"\x01")
+        except BlockingIOError:
+            pass  # The reader has wakeups pending already
+        except OSError:  # The reader went away
+            os.close(self.notify_fd)
+            self.notify_fd = None
+
+    def read_latest(self, out, times=None, retries=3):
+        """Copies the newest complete record into out. Returns its sequence number or None.
+
+        If times is given (an int64 array of TIME_COUNT), the record's stamps are copied too.
+        """
+        for _ in range(retries):
+            written = int(self.header[3])
+            if written == 0:
+                return None
+            seq = written - 1
+            index = seq % self.capacity
+            if self.seqs[index] != seq:
+                continue
+            out[:] = self.records[index]
+            if times is not None:
+                times[:] = self.times[index]
+            if self.seqs[index] == seq:
+                return seq
+        return None
+
+class RingReader:
+    """Reader side of a ring that may not exist yet.
+
+    The relay can start before the loggers, so mapping the ring is retried
+    at most once every retry_interval seconds until it succeeds. sequence is
+    -1 while the ring is unavailable.
+    """
+
+    def __init__(self, path, retry_interval=NOTIFY_RETRY_INTERVAL):
+        self.path = path
+        self.retry_interval = retry_interval
+        self.retry_at = 0.0
+        self.ring = None
+
+    def _ring(self):
+        if self.ring is None:
+            now = time.monotonic()
+            if now < self.retry_at:
+                return None
+            try:
+                self.ring = SampleRing.open(self.path)
+            except (OSError, ValueError):
+                self.retry_at = now + self.retry_interval
+                return None
+        return self.ring
+
+    @property
+    def sequence(self):
+        ring = self._ring()
+        return -1 if ring is None else ring.sequence
+
+    def read_latest(self, out, times=None):
+        ring = self._ring()
+        if ring is None:
+            return None
+        return ring.read_latest(out, times)
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+class RingWatcher:
+    """Wakes the relay loop when any of the given rings (or RingReaders) has a new record.
+
+    Same wait()/stop() interface as the file watchers in the relay program.
+    wait() sleeps in select() on each ring's notification FIFO, which the
+    writer signals on every publish, so a new record ends the wait at once
+    and nothing runs while the rings are idle. A ring whose FIFO cannot be
+    opened is checked every poll_interval instead.
+    """
+    event_driven = True
+
+    def __init__(self, rings, poll_interval=0.002):
+        self.rings = rings
+        self.poll_interval = poll_interval
+        self.seen = [ring.sequence for ring in rings]
+        self.fds = []
+        self.polling = False
+        for ring in rings:
+            try:
+                # Opened read-write so the FIFO never reports end-of-file while no writer has it open
+                self.fds.append(os.open(make_notify_fifo(ring.path), os.O_RDWR | os.O_NONBLOCK))
+            except OSError as e:
+                print(f"No ring notification for {ring.path}, polling it: {e}")
+                self.polling = True
+        self.wake_read, self.wake_write = os.pipe()
+        os.set_blocking(self.wake_read, False)
+        os.set_blocking(self.wake_write, False)
+
+    def start(self):
+        return self
+
+    def stop(self):
+        for fd in self.fds + [self.wake_read, self.wake_write]:
+            os.close(fd)
+        self.fds = []
+
+    @staticmethod
+    def _drain(fd):
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            current = [ring.sequence for ring in self.rings]
+            if current != self.seen:
+                self.seen = current
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self.polling:
+                remaining = min(remaining, self.poll_interval)
+            readable, _, _ = select.select(self.fds + [self.wake_read], [], [], remaining)
+            for fd in readable:
+                self._drain(fd)
+            if self.wake_read in readable:
+                return False
+
+    def wake(self):
+        """Ends the current wait early (e.g. on a button press). Safe from any thread."""
+        try:
+            os.write(self.wake_write, b"\x01")
+        except BlockingIOError:
+            pass  # A wakeup is pending already
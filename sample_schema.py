@@ -0,0 +1,105 @@
+import os
+
+# Column layout shared by the loggers' CSV files, the relay, the dashboard and
+# the cloud uploader. Index constants are CSV column positions (Computer_TS is 0).
+HEADERS = [
+    "Computer_TS",
+    "A Phase Voltage", "A Phase Current", "A Phase Active Power", "A Phase Reactive Power",
+    "A Phase Apparent Power", "A Power Factor",
+    "B Phase Voltage", "B Phase Current", "B Phase Active Power", "B Phase Reactive Power",
+    "B Phase Apparent Power", "B Power Factor",
+    "C Phase Voltage", "C Phase Current", "C Phase Active Power", "C Phase Reactive Power",
+    "C Phase Apparent Power", "C Power Factor",
+    "Frequency", "DC Voltage", "DC Current", "Temperature"
+]
+
+(COMPUTER_TS,
+ A_PHASE_VOLTAGE, A_PHASE_CURRENT, A_PHASE_ACTIVE_POWER, A_PHASE_REACTIVE_POWER, A_PHASE_APPARENT_POWER, A_POWER_FACTOR,
+ B_PHASE_VOLTAGE, B_PHASE_CURRENT, B_PHASE_ACTIVE_POWER, B_PHASE_REACTIVE_POWER, B_PHASE_APPARENT_POWER, B_POWER_FACTOR,
+ C_PHASE_VOLTAGE, C_PHASE_CURRENT, C_PHASE_ACTIVE_POWER, C_PHASE_REACTIVE_POWER, C_PHASE_APPARENT_POWER, C_POWER_FACTOR,
+ FREQUENCY, DC_VOLTAGE, DC_CURRENT, TEMPERATURE) = range(len(HEADERS))
+
+COLUMN_COUNT = len(HEADERS)
+VALUE_NAMES = HEADERS[1:]      # The 22 numeric meter fields
+VALUE_COUNT = len(VALUE_NAMES)
+VALUE_OFFSET = 1               # Column index minus VALUE_OFFSET is the index into Sample.values
+
+# (voltage, current) columns per phase
+PHASE_COLUMNS = {
+    "A": (A_PHASE_VOLTAGE, A_PHASE_CURRENT),
+    "B": (B_PHASE_VOLTAGE, B_PHASE_CURRENT),
+    "C": (C_PHASE_VOLTAGE, C_PHASE_CURRENT),
+}
+
+# (active, reactive, apparent power, power factor) columns per phase
+PHASE_POWER_COLUMNS = {
+    "A": (A_PHASE_ACTIVE_POWER, A_PHASE_REACTIVE_POWER, A_PHASE_APPARENT_POWER, A_POWER_FACTOR),
+    "B": (B_PHASE_ACTIVE_POWER, B_PHASE_REACTIVE_POWER, B_PHASE_APPARENT_POWER, B_POWER_FACTOR),
+    "C": (C_PHASE_ACTIVE_POWER, C_PHASE_REACTIVE_POWER, C_PHASE_APPARENT_POWER, C_POWER_FACTOR),
+}
+
+class Sample:
+    """One parsed meter sample: the Computer_TS string and 22 floats.
+
+    sample[column] accepts the column constants above, so sample[FREQUENCY]
+    is the frequency and sample[COMPUTER_TS] the timestamp string.
+    """
+    __slots__ = ("computer_ts", "values")
+
+    def __init__(self, computer_ts, values):
+        self.computer_ts = computer_ts
+        self.values = values
+
+    def __getitem__(self, column):
+        if column == COMPUTER_TS:
+            return self.computer_ts
+        return self.values[column - VALUE_OFFSET]
+
+    def as_dict(self):
+        """Column name -> value for the 22 meter fields."""
+        return dict(zip(VALUE_NAMES, self.values))
+
+def parse_values(fields):
+    """Converts the 22 meter fields to floats. Returns None if any is missing or invalid."""
+    if len(fields) != VALUE_COUNT:
+        return None
+    try:
+        return tuple(map(float, fields))
+    except ValueError:
+        return None
+
+def parse_meter_line(line, computer_ts):
+    """Parses a raw comma-separated meter line (22 values, no timestamp) from the serial port."""
+    values = parse_values(line.split(','))
+    if values is None:
+        return None
+    return Sample(computer_ts, values)
+
+def parse_line(line):
+    """Parses one CSV row (Computer_TS + 22 values) into a Sample, or None if it is incomplete."""
+    fields = line.rstrip('\r\n').split(',')
+    if len(fields) != COLUMN_COUNT:
+        return None
+    values = parse_values(fields[1:])
+    if values is None:
+        return None
+    return Sample(fields[0], values)
+
+def read_last_sample(file_path, tail_bytes=4096):
+    """Parses the last complete row of a real-time or log CSV file.
+
+    Only the end of the file is read, so this costs the same for a one-row
+    real-time file and a long power log. A final row without its line ending
+    is still being written and is skipped. Returns None if there is no data row.
+    """
+    with open(file_path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - tail_bytes))
+        data = f.read()
+    lines = data.decode(errors='ignore').splitlines()
+    if not data.endswith(b'\n'):
+        lines = lines[:-1]
+    for line in reversed(lines):
+        if line and not line.startswith(HEADERS[0]):
+            return parse_line(line)
+    return None
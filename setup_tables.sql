@@ -1,4 +1,4 @@
--- Create input_real_time_data table
+-- Create input_real_time_data table: the live sample, a single row updated in place
 CREATE TABLE IF NOT EXISTS input_real_time_data (
     id BIGSERIAL PRIMARY KEY,
     Computer_TS TIMESTAMP WITH TIME ZONE,
@@ -27,7 +27,7 @@ CREATE TABLE IF NOT EXISTS input_real_time_data (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- Create output_real_time_data table
+-- Create output_real_time_data table: the live sample, a single row updated in place
 CREATE TABLE IF NOT EXISTS output_real_time_data (
     id BIGSERIAL PRIMARY KEY,
     Computer_TS TIMESTAMP WITH TIME ZONE,
@@ -62,4 +62,66 @@ CREATE INDEX IF NOT EXISTS idx_output_computer_ts ON output_real_time_data(Compu
 
 -- Create unique constraints to prevent duplicates
 CREATE UNIQUE INDEX IF NOT EXISTS idx_input_unique_ts ON input_real_time_data(Computer_TS);
-CREATE UNIQUE INDEX IF NOT EXISTS idx_output_unique_ts ON output_real_time_data(Computer_TS); 
\ No newline at end of file
+CREATE UNIQUE INDEX IF NOT EXISTS idx_output_unique_ts ON output_real_time_data(Computer_TS);
+
+-- Create input_history_data table: every logged sample, one row per Computer_TS (HistoryUploader)
+CREATE TABLE IF NOT EXISTS input_history_data (
+    id BIGSERIAL PRIMARY KEY,
+    Computer_TS TIMESTAMP WITH TIME ZONE,
+    "A Phase Voltage" DOUBLE PRECISION,
+    "A Phase Current" DOUBLE PRECISION,
+    "A Phase Active Power" DOUBLE PRECISION,
+    "A Phase Reactive Power" DOUBLE PRECISION,
+    "A Phase Apparent Power" DOUBLE PRECISION,
+    "A Power Factor" DOUBLE PRECISION,
+    "B Phase Voltage" DOUBLE PRECISION,
+    "B Phase Current" DOUBLE PRECISION,
+    "B Phase Active Power" DOUBLE PRECISION,
+    "B Phase Reactive Power" DOUBLE PRECISION,
+    "B Phase Apparent Power" DOUBLE PRECISION,
+    "B Power Factor" DOUBLE PRECISION,
+    "C Phase Voltage" DOUBLE PRECISION,
+    "C Phase Current" DOUBLE PRECISION,
+    "C Phase Active Power" DOUBLE PRECISION,
+    "C Phase Reactive Power" DOUBLE PRECISION,
+    "C Phase Apparent Power" DOUBLE PRECISION,
+    "C Power Factor" DOUBLE PRECISION,
+    "Frequency" DOUBLE PRECISION,
+    "DC Voltage" DOUBLE PRECISION,
+    "DC Current" DOUBLE PRECISION,
+    "Temperature" DOUBLE PRECISION,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create output_history_data table: every logged sample, one row per Computer_TS (HistoryUploader)
+CREATE TABLE IF NOT EXISTS output_history_data (
+    id BIGSERIAL PRIMARY KEY,
+    Computer_TS TIMESTAMP WITH TIME ZONE,
+    "A Phase Voltage" DOUBLE PRECISION,
+    "A Phase Current" DOUBLE PRECISION,
+    "A Phase Active Power" DOUBLE PRECISION,
+    "A Phase Reactive Power" DOUBLE PRECISION,
+    "A Phase Apparent Power" DOUBLE PRECISION,
+    "A Power Factor" DOUBLE PRECISION,
+    "B Phase Voltage" DOUBLE PRECISION,
+    "B Phase Current" DOUBLE PRECISION,
+    "B Phase Active Power" DOUBLE PRECISION,
+    "B Phase Reactive Power" DOUBLE PRECISION,
+    "B Phase Apparent Power" DOUBLE PRECISION,
+    "B Power Factor" DOUBLE PRECISION,
+    "C Phase Voltage" DOUBLE PRECISION,
+    "C Phase Current" DOUBLE PRECISION,
+    "C Phase Active Power" DOUBLE PRECISION,
+    "C Phase Reactive Power" DOUBLE PRECISION,
+    "C Phase Apparent Power" DOUBLE PRECISION,
+    "C Power Factor" DOUBLE PRECISION,
+    "Frequency" DOUBLE PRECISION,
+    "DC Voltage" DOUBLE PRECISION,
+    "DC Current" DOUBLE PRECISION,
+    "Temperature" DOUBLE PRECISION,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- The history upload upserts on Computer_TS, so a resent batch overwrites itself
+CREATE UNIQUE INDEX IF NOT EXISTS idx_input_history_unique_ts ON input_history_data(Computer_TS);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_output_history_unique_ts ON output_history_data(Computer_TS);